@@ -0,0 +1,15 @@
+"""
+Celery application for the ai_copywriter project.
+
+Start a worker with:  celery -A ai_copywriter worker -l info
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ai_copywriter.settings')
+
+app = Celery('ai_copywriter')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
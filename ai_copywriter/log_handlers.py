@@ -0,0 +1,45 @@
+"""
+Logging handlers for the ai_copywriter project.
+"""
+
+import atexit
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+
+class QueueListenerHandler(QueueHandler):
+    """
+    Hand records to a background thread that writes them to the wrapped handlers,
+    so request threads never block on log I/O.
+
+    Configure through LOGGING with the target handlers referenced as
+    ``cfg://handlers.<name>``.
+    """
+
+    def __init__(self, handlers, respect_handler_level=True):
+        # dictConfig passes a ConvertingList; indexing resolves the cfg:// references
+        self._handlers = [handlers[i] for i in range(len(handlers))]
+        self._respect_handler_level = respect_handler_level
+        super().__init__(queue.Queue(-1))
+        self._start_listener()
+        atexit.register(self._stop_listener)
+        # Forked workers (gunicorn, Celery prefork) don't inherit the listener thread
+        os.register_at_fork(after_in_child=self._restart_in_child)
+
+    def _start_listener(self):
+        self._listener = QueueListener(
+            self.queue, *self._handlers,
+            respect_handler_level=self._respect_handler_level
+        )
+        self._listener.start()
+
+    def _stop_listener(self):
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+    def _restart_in_child(self):
+        # The inherited queue's locks may have been held at fork time
+        self.queue = queue.Queue(-1)
+        self._start_listener()
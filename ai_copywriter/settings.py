@@ -192,6 +192,25 @@ CACHES = {
     }
 }
 
+# Share the cache between web processes and Celery workers when Redis is available
+REDIS_CACHE_URL = config('REDIS_CACHE_URL', default='')
+if REDIS_CACHE_URL:
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_CACHE_URL,
+        'TIMEOUT': 3600,  # 1 hour
+    }
+
+# Celery (background content generation)
+# Without a broker URL, tasks run inline in the web process (eager mode)
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='')
+CELERY_RESULT_BACKEND = config('CELERY_RESULT_BACKEND', default=CELERY_BROKER_URL)
+CELERY_TASK_ALWAYS_EAGER = not CELERY_BROKER_URL
+CELERY_ACCEPT_CONTENT = ['json']
+CELERY_TASK_SERIALIZER = 'json'
+CELERY_RESULT_SERIALIZER = 'json'
+CELERY_RESULT_EXPIRES = 3600  # 1 hour
+
 # Logging configuration
 LOGGING = {
     'version': 1,
@@ -208,6 +227,11 @@ LOGGING = {
             'class': 'logging.StreamHandler',
             'formatter': 'simple',
         },
+        # Writes to file/console from a background thread
+        'queue': {
+            '()': 'ai_copywriter.log_handlers.QueueListenerHandler',
+            'handlers': ['cfg://handlers.file', 'cfg://handlers.console'],
+        },
     },
     'formatters': {
         'verbose': {
@@ -221,12 +245,12 @@ LOGGING = {
     },
     'loggers': {
         'apps.generator': {
-            'handlers': ['file', 'console'],
+            'handlers': ['queue'],
             'level': 'INFO',
             'propagate': False,
         },
         'utils.bedrock_client': {
-            'handlers': ['file', 'console'],
+            'handlers': ['queue'],
             'level': 'INFO',
             'propagate': False,
         },
@@ -49,9 +49,9 @@ class GenerationRequestAdmin(admin.ModelAdmin):
 @admin.register(GeneratedContent)
 class GeneratedContentAdmin(admin.ModelAdmin):
     list_display = ['request', 'user', 'variation_number', 'is_favorite', 'quality_rating', 'created_at']
-    list_filter = ['is_favorite', 'is_published', 'quality_rating', 'was_cached', 'created_at']
+    list_filter = ['is_favorite', 'is_published', 'is_deleted', 'quality_rating', 'was_cached', 'created_at']
     search_fields = ['request__product_name', 'user__username', 'generated_text']
-    readonly_fields = ['id', 'created_at', 'updated_at', 'last_accessed']
+    readonly_fields = ['id', 'created_at', 'updated_at', 'last_accessed', 'deleted_at']
     
     fieldsets = (
         ('Basic Info', {
@@ -61,7 +61,7 @@ class GeneratedContentAdmin(admin.ModelAdmin):
             'fields': ('generated_text', 'edited_text', 'final_text')
         }),
         ('User Interactions', {
-            'fields': ('is_favorite', 'is_published', 'quality_rating', 'user_feedback')
+            'fields': ('is_favorite', 'is_published', 'quality_rating', 'user_feedback', 'is_deleted', 'deleted_at')
         }),
         ('Usage Stats', {
             'fields': ('copy_count', 'share_count', 'was_cached', 'created_at', 'updated_at', 'last_accessed')
@@ -106,7 +106,7 @@ class UserUsageStatsAdmin(admin.ModelAdmin):
             'fields': ('total_requests', 'successful_generations', 'failed_generations')
         }),
         ('Content Stats', {
-            'fields': ('total_content_pieces', 'favorite_content_count', 'published_content_count')
+            'fields': ('total_content_pieces', 'content_type_counts', 'favorite_content_count', 'published_content_count')
         }),
         ('Model Usage', {
             'fields': ('fast_model_usage', 'quality_model_usage')
@@ -17,6 +17,8 @@ def check_user_limit(view_func):
 
         usage_stats, _ = UserUsageStats.objects.get_or_create(user=request.user)
         can_request, reason = usage_stats.can_make_request()
+        # Let the view reuse the row instead of fetching it again
+        request.user_usage_stats = usage_stats
 
         if not can_request:
             error_message = "You have reached your daily generation limit. Please try again tomorrow."
@@ -4,16 +4,31 @@ Focus on easy copy-paste and simple export formats
 """
 import json
 import csv
+import textwrap
 from io import StringIO
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.utils import timezone
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+class _Echo:
+    """File-like object whose write() hands the line back, for streaming csv.writer output"""
+    
+    def write(self, value):
+        return value
+
+
 class ContentExporter:
     """Handle content export in various formats"""
     
+    BULK_CONTENT_TYPES = {
+        'csv': 'text/csv',
+        'json': 'application/json',
+        'txt': 'text/plain; charset=utf-8',
+    }
+    
     def __init__(self):
         self.supported_formats = ['csv', 'json', 'txt']
     
@@ -30,7 +45,7 @@ class ContentExporter:
             return self._export_txt_single(content_item)
     
     def export_bulk(self, content_items, format_type='csv'):
-        """Export multiple content items"""
+        """Export multiple content items (any iterable; it is consumed once)"""
         if format_type not in self.supported_formats:
             raise ValueError(f"Unsupported format: {format_type}")
         
@@ -133,89 +148,128 @@ Exported: {timezone.now().strftime('%Y-%m-%d %H:%M:%S')}
             logger.error(f"TXT export error: {e}")
             return JsonResponse({'error': 'Failed to export TXT'}, status=500)
     
-    def _export_csv_bulk(self, content_items):
-        """Export multiple items as CSV"""
+    def stream_bulk(self, content_items, format_type='csv', total=None):
+        """
+        Stream multiple content items as a download; rows are written as the
+        iterable yields them, so a queryset iterator is never held in memory.
+        """
+        if format_type not in self.supported_formats:
+            raise ValueError(f"Unsupported format: {format_type}")
+        
+        response = StreamingHttpResponse(
+            self._log_stream_errors(self.iter_bulk(content_items, format_type, total), format_type),
+            content_type=self.BULK_CONTENT_TYPES[format_type]
+        )
+        timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
+        response['Content-Disposition'] = f'attachment; filename="content_export_{timestamp}.{format_type}"'
+        return response
+    
+    def iter_bulk(self, content_items, format_type='csv', total=None):
+        """Yield the export document in chunks (total is required for json and txt headers)"""
+        if format_type == 'csv':
+            return self._iter_csv_bulk(content_items)
+        elif format_type == 'json':
+            return self._iter_json_bulk(content_items, total)
+        else:  # format_type == 'txt'
+            return self._iter_txt_bulk(content_items, total)
+    
+    def _log_stream_errors(self, chunks, format_type):
+        """Headers are already sent once streaming starts, so failures can only be logged"""
         try:
-            output = StringIO()
-            writer = csv.writer(output)
-            
-            # Write headers
-            writer.writerow([
-                'ID', 'Product Name', 'Category', 'Content Type', 
-                'Generated Text', 'Created Date', 'Is Favorite'
-            ])
-            
-            # Write data
-            for item in content_items:
-                writer.writerow([
-                    str(item.id),
-                    item.request.product_name,
-                    item.request.category.name,
-                    item.request.content_type.name,
-                    item.generated_text,
-                    item.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                    item.is_favorite
-                ])
-            
-            timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
-            response = HttpResponse(output.getvalue(), content_type='text/csv')
-            response['Content-Disposition'] = f'attachment; filename="content_export_{timestamp}.csv"'
-            return response
-            
+            yield from chunks
         except Exception as e:
-            logger.error(f"Bulk CSV export error: {e}")
-            return JsonResponse({'error': 'Failed to export CSV'}, status=500)
+            logger.error(f"Bulk {format_type.upper()} export error: {e}")
     
-    def _export_json_bulk(self, content_items):
-        """Export multiple items as JSON"""
+    def _export_bulk_buffered(self, content_items, format_type, error_message):
+        """Build a complete (non-streaming) bulk export response"""
         try:
-            data = {
-                'export_info': {
-                    'total_items': len(content_items),
-                    'export_date': timezone.now().isoformat(),
-                    'format': 'json'
-                },
-                'content_items': []
-            }
-            
-            for item in content_items:
-                data['content_items'].append({
-                    'id': str(item.id),
-                    'product_name': item.request.product_name,
-                    'category': item.request.category.name,
-                    'content_type': item.request.content_type.name,
-                    'generated_text': item.generated_text,
-                    'edited_text': item.edited_text,
-                    'is_favorite': item.is_favorite,
-                    'created_at': item.created_at.isoformat(),
-                    'updated_at': item.updated_at.isoformat()
-                })
+            items = list(content_items)
+            content = ''.join(self.iter_bulk(items, format_type, len(items)))
             
             timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
-            response = HttpResponse(
-                json.dumps(data, indent=2, ensure_ascii=False),
-                content_type='application/json'
-            )
-            response['Content-Disposition'] = f'attachment; filename="content_export_{timestamp}.json"'
+            response = HttpResponse(content, content_type=self.BULK_CONTENT_TYPES[format_type])
+            response['Content-Disposition'] = f'attachment; filename="content_export_{timestamp}.{format_type}"'
             return response
             
         except Exception as e:
-            logger.error(f"Bulk JSON export error: {e}")
-            return JsonResponse({'error': 'Failed to export JSON'}, status=500)
+            logger.error(f"Bulk {format_type.upper()} export error: {e}")
+            return JsonResponse({'error': error_message}, status=500)
+    
+    def _export_csv_bulk(self, content_items):
+        """Export multiple items as CSV"""
+        return self._export_bulk_buffered(content_items, 'csv', 'Failed to export CSV')
+    
+    def _export_json_bulk(self, content_items):
+        """Export multiple items as JSON"""
+        return self._export_bulk_buffered(content_items, 'json', 'Failed to export JSON')
     
     def _export_txt_bulk(self, content_items):
         """Export multiple items as plain text"""
-        try:
-            content = f"""AI Copywriter - Bulk Content Export
+        return self._export_bulk_buffered(content_items, 'txt', 'Failed to export TXT')
+    
+    def _iter_csv_bulk(self, content_items):
+        """Yield CSV one row at a time"""
+        writer = csv.writer(_Echo())
+        
+        # Write headers
+        yield writer.writerow([
+            'ID', 'Product Name', 'Category', 'Content Type', 
+            'Generated Text', 'Created Date', 'Is Favorite'
+        ])
+        
+        # Write data
+        for item in content_items:
+            yield writer.writerow([
+                str(item.id),
+                item.request.product_name,
+                item.request.category.name,
+                item.request.content_type.name,
+                item.generated_text,
+                item.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+                item.is_favorite
+            ])
+    
+    def _iter_json_bulk(self, content_items, total):
+        """Yield the same indented JSON document json.dumps(indent=2) would build, one item at a time"""
+        export_info = {
+            'total_items': total,
+            'export_date': timezone.now().isoformat(),
+            'format': 'json'
+        }
+        yield '{\n  "export_info": '
+        yield textwrap.indent(json.dumps(export_info, indent=2, ensure_ascii=False), '  ').lstrip()
+        yield ',\n  "content_items": ['
+        
+        separator = '\n'
+        for item in content_items:
+            exported_item = {
+                'id': str(item.id),
+                'product_name': item.request.product_name,
+                'category': item.request.category.name,
+                'content_type': item.request.content_type.name,
+                'generated_text': item.generated_text,
+                'edited_text': item.edited_text,
+                'is_favorite': item.is_favorite,
+                'created_at': item.created_at.isoformat(),
+                'updated_at': item.updated_at.isoformat()
+            }
+            yield separator + textwrap.indent(json.dumps(exported_item, indent=2, ensure_ascii=False), '    ')
+            separator = ',\n'
+        
+        # An empty list stays on one line, as json.dumps writes it
+        yield ']\n}' if separator == '\n' else '\n  ]\n}'
+    
+    def _iter_txt_bulk(self, content_items, total):
+        """Yield plain text one item at a time"""
+        yield f"""AI Copywriter - Bulk Content Export
 =====================================
 
-Total Items: {len(content_items)}
+Total Items: {total}
 Export Date: {timezone.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 """
-            
-            for i, item in enumerate(content_items, 1):
-                content += f"""
+        for i, item in enumerate(content_items, 1):
+            yield f"""
 Item {i}:
 --------
 Product: {item.request.product_name}
@@ -234,12 +288,3 @@ Generated Content:
 {'='*50}
 
 """
-            
-            timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
-            response = HttpResponse(content, content_type='text/plain; charset=utf-8')
-            response['Content-Disposition'] = f'attachment; filename="content_export_{timestamp}.txt"'
-            return response
-            
-        except Exception as e:
-            logger.error(f"Bulk TXT export error: {e}")
-            return JsonResponse({'error': 'Failed to export TXT'}, status=500)
\ No newline at end of file
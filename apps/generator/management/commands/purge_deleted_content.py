@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from datetime import timedelta
+
+from apps.generator.storage import ContentStorageService
+
+
+class Command(BaseCommand):
+    help = 'Permanently delete generated content that was soft-deleted more than N days ago'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Retention period for soft-deleted content', default=30)
+        parser.add_argument('--batch-size', type=int, help='Rows deleted per batch', default=500)
+
+    def handle(self, *args, **options):
+        purged = ContentStorageService.purge_deleted_content(
+            older_than=timedelta(days=options['days']),
+            batch_size=options['batch_size']
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'Purged {purged} soft-deleted content item(s)')
+        )
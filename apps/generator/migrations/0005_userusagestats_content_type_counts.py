@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-16 09:12
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_content_type_counts(apps, schema_editor):
+    UserUsageStats = apps.get_model('generator', 'UserUsageStats')
+    GeneratedContent = apps.get_model('generator', 'GeneratedContent')
+
+    counts_by_user = {}
+    rows = GeneratedContent.objects.values(
+        'user_id', 'request__content_type__name', 'request__content_type__platform'
+    ).annotate(count=Count('id')).order_by()
+    for row in rows:
+        key = f"{row['request__content_type__name']}|{row['request__content_type__platform']}"
+        counts_by_user.setdefault(row['user_id'], {})[key] = row['count']
+
+    for stats in UserUsageStats.objects.filter(user_id__in=counts_by_user.keys()):
+        stats.content_type_counts = counts_by_user[stats.user_id]
+        stats.save(update_fields=['content_type_counts'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('generator', '0004_update_usage_limits'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userusagestats',
+            name='content_type_counts',
+            field=models.JSONField(blank=True, default=dict, help_text="Saved content count per 'content_type|platform'"),
+        ),
+        migrations.RunPython(backfill_content_type_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-16 09:40
+
+from django.db import migrations
+
+INDEX_NAME = 'gc_text_search_idx'
+
+
+def _search_index():
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    # Same expression as ContentStorageService.search_content so the planner can use it
+    return GinIndex(SearchVector('generated_text', config='simple'), name=INDEX_NAME)
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    GeneratedContent = apps.get_model('generator', 'GeneratedContent')
+    schema_editor.add_index(GeneratedContent, _search_index())
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    GeneratedContent = apps.get_model('generator', 'GeneratedContent')
+    schema_editor.remove_index(GeneratedContent, _search_index())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('generator', '0005_userusagestats_content_type_counts'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
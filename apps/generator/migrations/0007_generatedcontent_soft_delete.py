@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-16 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('generator', '0006_generatedcontent_text_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generatedcontent',
+            name='is_deleted',
+            field=models.BooleanField(default=False, help_text='Soft-deleted; purged by purge_deleted_content'),
+        ),
+        migrations.AddField(
+            model_name='generatedcontent',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='generatedcontent',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['user', '-created_at'], name='gc_user_live_created_idx'),
+        ),
+    ]
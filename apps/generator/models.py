@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
@@ -177,6 +179,8 @@ class GeneratedContent(models.Model):
     # User interactions
     is_favorite = models.BooleanField(default=False)
     is_published = models.BooleanField(default=False)
+    is_deleted = models.BooleanField(default=False, help_text="Soft-deleted; purged by purge_deleted_content")
+    deleted_at = models.DateTimeField(null=True, blank=True)
     quality_rating = models.IntegerField(
         choices=QUALITY_CHOICES, 
         null=True, 
@@ -200,6 +204,11 @@ class GeneratedContent(models.Model):
             models.Index(fields=['user', '-created_at']),
             models.Index(fields=['is_favorite', '-created_at']),
             models.Index(fields=['request', 'variation_number']),
+            models.Index(
+                fields=['user', '-created_at'],
+                condition=models.Q(is_deleted=False),
+                name='gc_user_live_created_idx'
+            ),
         ]
     
     def __str__(self):
@@ -285,6 +294,7 @@ class UserUsageStats(models.Model):
     
     # Content stats
     total_content_pieces = models.IntegerField(default=0)
+    content_type_counts = models.JSONField(default=dict, blank=True, help_text="Saved content count per 'content_type|platform'")
     favorite_content_count = models.IntegerField(default=0)
     published_content_count = models.IntegerField(default=0)
     
@@ -331,15 +341,17 @@ class UserUsageStats(models.Model):
     
     def can_make_request(self):
         """Check if user can make another request. Returns (can_request, reason)."""
+        now = timezone.now()
+        
         # Check and reset daily limit
-        if (timezone.now() - self.last_daily_reset).days >= 1:
+        if (now - self.last_daily_reset).days >= 1:
             self.reset_daily_usage()
 
         if self.daily_requests_used >= self.daily_request_limit:
             return False, "daily_limit_reached"
 
         # Check and reset monthly limit
-        current_month_start = timezone.now().date().replace(day=1)
+        current_month_start = now.date().replace(day=1)
         if self.current_month < current_month_start:
             self.reset_monthly_usage()
         
@@ -349,18 +361,23 @@ class UserUsageStats(models.Model):
         return True, "ok"
     
     def increment_request_count(self, success=True):
-        """Increment request counters"""
-        self.total_requests += 1
-        self.monthly_requests_used += 1
-        self.daily_requests_used += 1
-        self.last_usage = timezone.now()
-        
-        if success:
-            self.successful_generations += 1
-        else:
-            self.failed_generations += 1
+        """
+        Increment request counters in a single atomic UPDATE.
+        The in-memory instance is not refreshed; reload it if the new values are needed.
+        """
+        from apps.generator.storage import invalidate_user_caches
 
-        if not self.first_usage:
-            self.first_usage = self.last_usage
-        
-        self.save()
+        now = timezone.now()
+        outcome_field = 'successful_generations' if success else 'failed_generations'
+
+        type(self).objects.filter(pk=self.pk).update(
+            total_requests=F('total_requests') + 1,
+            monthly_requests_used=F('monthly_requests_used') + 1,
+            daily_requests_used=F('daily_requests_used') + 1,
+            last_usage=now,
+            first_usage=Coalesce('first_usage', Value(now)),
+            **{outcome_field: F(outcome_field) + 1}
+        )
+
+        # Queryset updates bypass post_save, so drop the cached dashboard data here
+        invalidate_user_caches(self.user_id)
@@ -0,0 +1,36 @@
+"""
+JSON responses serialized with orjson
+"""
+
+from decimal import Decimal
+from typing import Iterable
+
+import orjson
+from django.http import HttpResponse
+
+
+def _default(obj):
+    """Serialize types orjson doesn't handle natively, matching DjangoJSONEncoder"""
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(data) -> bytes:
+    """Serialize data to JSON bytes"""
+    return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class OrjsonResponse(HttpResponse):
+    """Drop-in replacement for JsonResponse; orjson.dumps already returns bytes"""
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(dumps(data), **kwargs)
+
+
+def ndjson_lines(items: Iterable):
+    """Encode each item as one line of newline-delimited JSON"""
+    for item in items:
+        yield dumps(item) + b'\n'
+
@@ -6,7 +6,7 @@ Integrates prompts with Bedrock client for Indonesian creative economy content
 import logging
 import hashlib
 import re
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, Iterator, List, Optional, Any, Union
 from django.core.cache import cache
 from django.conf import settings
 from decimal import Decimal
@@ -20,6 +20,18 @@ logger = logging.getLogger(__name__)
 class ContentGenerationService:
     """Service for generating AI content with business logic"""
     
+    _shared_instance = None
+    
+    @classmethod
+    def shared(cls) -> 'ContentGenerationService':
+        """
+        Process-wide instance, so the Bedrock client is built once per process.
+        The service keeps no per-request state and boto3 clients are thread-safe.
+        """
+        if cls._shared_instance is None:
+            cls._shared_instance = cls()
+        return cls._shared_instance
+    
     def __init__(self):
         self.bedrock_client = BedrockClient()
         self.prompt_templates = PromptTemplates()
@@ -53,18 +65,7 @@ class ContentGenerationService:
             Dictionary with generated content and metadata
         """
         try:
-            # Validate inputs
-            self.validator.validate_parameters(length, tone)
-            cleaned_info = self.validator.clean_product_info(product_info)
-            
-            # Generate prompt
-            prompt = self.prompt_templates.product_description(
-                product_info=cleaned_info,
-                length=length,
-                tone=tone
-            )
-            
-            logger.info(f"Generating product description for {cleaned_info['name']}")
+            prompt = self._product_description_prompt(product_info, length, tone)
             
             if variations == 1:
                 # Single generation
@@ -99,7 +100,9 @@ class ContentGenerationService:
                 results = self.bedrock_client.generate_multiple_variations(
                     prompt=prompt,
                     variations=variations,
-                    model_type=model_type
+                    model_type=model_type,
+                    use_cache=True,
+                    user=user
                 )
                 
                 # Add cost estimation to each result
@@ -124,17 +127,12 @@ class ContentGenerationService:
                 
         except (BedrockClientError, ValueError) as e:
             logger.error(f"Product description generation failed: {e}")
-            return {
-                'success': False,
-                'error': str(e),
-                'content': [],
-                'parameters': {
-                    'length': length,
-                    'tone': tone,
-                    'model_type': model_type,
-                    'variations': variations
-                }
-            }
+            return self._error_payload({
+                'length': length,
+                'tone': tone,
+                'model_type': model_type,
+                'variations': variations
+            }, e)
     
     def generate_social_media_caption(self,
                                     product_info: Dict[str, Any],
@@ -144,18 +142,7 @@ class ContentGenerationService:
                                     variations: int = 1) -> Dict[str, Any]:
         """Generate social media caption content"""
         try:
-            # Validate inputs
-            self.validator.validate_parameters(length, "casual", platform)
-            cleaned_info = self.validator.clean_product_info(product_info)
-            
-            # Generate prompt
-            prompt = self.prompt_templates.social_media_caption(
-                product_info=cleaned_info,
-                platform=platform,
-                length=length
-            )
-            
-            logger.info(f"Generating {platform} caption for {cleaned_info['name']}")
+            prompt = self._social_media_prompt(product_info, platform, length)
             
             if variations == 1:
                 result = self.bedrock_client.generate_content(
@@ -186,7 +173,8 @@ class ContentGenerationService:
                 results = self.bedrock_client.generate_multiple_variations(
                     prompt=prompt,
                     variations=variations,
-                    model_type=model_type
+                    model_type=model_type,
+                    use_cache=True
                 )
                 
                 for result in results:
@@ -210,16 +198,11 @@ class ContentGenerationService:
                 
         except (BedrockClientError, ValueError) as e:
             logger.error(f"Social media caption generation failed: {e}")
-            return {
-                'success': False,
-                'error': str(e),
-                'content': [],
-                'parameters': {
-                    'platform': platform,
-                    'model_type': model_type,
-                    'variations': variations
-                }
-            }
+            return self._error_payload({
+                'platform': platform,
+                'model_type': model_type,
+                'variations': variations
+            }, e)
     
     def generate_marketing_headline(self,
                                   product_info: Dict[str, Any],
@@ -247,7 +230,8 @@ class ContentGenerationService:
                 additional_instructions=additional_instructions
             )
             
-            logger.info(f"Generating {variations} {headline_type} headlines for {cleaned_info['name']} ({usage_context})")
+            logger.info("Generating %s %s headlines for %s (%s)",
+                        variations, headline_type, cleaned_info['name'], usage_context)
             
             # Always generate as a single request with the specified number of variations
             result = self.bedrock_client.generate_content(
@@ -268,7 +252,7 @@ class ContentGenerationService:
             
             # Ensure we have at least the requested number of headlines
             if len(headlines) < variations:
-                logger.warning(f"Generated {len(headlines)} headlines but {variations} were requested")
+                logger.warning("Generated %s headlines but %s were requested", len(headlines), variations)
             
             # Create individual content items for each headline
             content_items = []
@@ -307,39 +291,16 @@ class ContentGenerationService:
                 }
             }
             
-        except (BedrockClientError, ValueError) as e:
-            logger.error(f"Marketing headline generation failed: {e}")
-            return {
-                'success': False,
-                'error': str(e),
-                'content': [],
-                'headlines': [],
-                'parameters': {
-                    'headline_type': headline_type,
-                    'usage_context': usage_context,
-                    'character_limit': character_limit,
-                    'tone': tone,
-                    'model_type': model_type,
-                    'variations': variations
-                }
-            }
-            
         except Exception as e:
             logger.error(f"Marketing headline generation failed: {e}")
-            return {
-                'success': False,
-                'error': str(e),
-                'content': [],
-                'headlines': [],
-                'parameters': {
-                    'headline_type': headline_type,
-                    'usage_context': usage_context,
-                    'character_limit': character_limit,
-                    'tone': tone,
-                    'model_type': model_type,
-                    'variations': variations
-                }
-            }
+            return self._error_payload({
+                'headline_type': headline_type,
+                'usage_context': usage_context,
+                'character_limit': character_limit,
+                'tone': tone,
+                'model_type': model_type,
+                'variations': variations
+            }, e, {'headlines': []})
     
     def generate_email_content(self,
                              product_info: Dict[str, Any],
@@ -359,7 +320,7 @@ class ContentGenerationService:
                 tone=tone
             )
             
-            logger.info(f"Generating {email_type} email for {cleaned_info['name']}")
+            logger.info("Generating %s email for %s", email_type, cleaned_info['name'])
             
             result = self.bedrock_client.generate_content(
                 prompt=prompt,
@@ -391,17 +352,11 @@ class ContentGenerationService:
             
         except (BedrockClientError, ValueError) as e:
             logger.error(f"Email content generation failed: {e}")
-            return {
-                'success': False,
-                'error': str(e),
-                'content': [],
-                'email_parts': {},
-                'parameters': {
-                    'email_type': email_type,
-                    'tone': tone,
-                    'model_type': model_type
-                }
-            }
+            return self._error_payload({
+                'email_type': email_type,
+                'tone': tone,
+                'model_type': model_type
+            }, e, {'email_parts': {}})
     
     def generate_website_copy(self,
                             product_info: Dict[str, Any],
@@ -421,7 +376,7 @@ class ContentGenerationService:
                 tone=tone
             )
             
-            logger.info(f"Generating {section} website copy for {cleaned_info['name']}")
+            logger.info("Generating %s website copy for %s", section, cleaned_info['name'])
             
             result = self.bedrock_client.generate_content(
                 prompt=prompt,
@@ -449,16 +404,32 @@ class ContentGenerationService:
             
         except (BedrockClientError, ValueError) as e:
             logger.error(f"Website copy generation failed: {e}")
-            return {
-                'success': False,
-                'error': str(e),
-                'content': [],
-                'parameters': {
-                    'section': section,
-                    'tone': tone,
-                    'model_type': model_type
-                }
-            }
+            return self._error_payload({
+                'section': section,
+                'tone': tone,
+                'model_type': model_type
+            }, e)
+    
+    def stream_product_description(self,
+                                   product_info: Dict[str, Any],
+                                   length: str = "medium",
+                                   tone: str = "professional",
+                                   model_type: str = "fast",
+                                   variations: int = 1,
+                                   user=None) -> Iterator[Dict[str, Any]]:
+        """Yield product description variations as each one is generated"""
+        prompt = self._product_description_prompt(product_info, length, tone)
+        yield from self._stream_variations(prompt, variations, model_type, user)
+    
+    def stream_social_media_caption(self,
+                                    product_info: Dict[str, Any],
+                                    platform: str = "instagram",
+                                    length: str = "medium",
+                                    model_type: str = "fast",
+                                    variations: int = 1) -> Iterator[Dict[str, Any]]:
+        """Yield social media caption variations as each one is generated"""
+        prompt = self._social_media_prompt(product_info, platform, length)
+        yield from self._stream_variations(prompt, variations, model_type)
     
     def test_connection(self) -> Dict[str, Any]:
         """Test connection to Bedrock service"""
@@ -482,6 +453,60 @@ class ContentGenerationService:
             'supported_lengths': list(PromptTemplates.LENGTHS.keys())
         }
     
+    def _product_description_prompt(self, product_info: Dict[str, Any], length: str, tone: str) -> str:
+        """Validate inputs and build the product description prompt"""
+        self.validator.validate_parameters(length, tone)
+        cleaned_info = self.validator.clean_product_info(product_info)
+        
+        logger.info("Generating product description for %s", cleaned_info['name'])
+        return self.prompt_templates.product_description(
+            product_info=cleaned_info,
+            length=length,
+            tone=tone
+        )
+    
+    def _social_media_prompt(self, product_info: Dict[str, Any], platform: str, length: str) -> str:
+        """Validate inputs and build the social media caption prompt"""
+        self.validator.validate_parameters(length, "casual", platform)
+        cleaned_info = self.validator.clean_product_info(product_info)
+        
+        logger.info("Generating %s caption for %s", platform, cleaned_info['name'])
+        return self.prompt_templates.social_media_caption(
+            product_info=cleaned_info,
+            platform=platform,
+            length=length
+        )
+    
+    def _stream_variations(self, prompt: str, variations: int, model_type: str,
+                           user=None) -> Iterator[Dict[str, Any]]:
+        """Yield Bedrock variations with cost estimates as they complete"""
+        for result in self.bedrock_client.iter_variations(
+            prompt=prompt,
+            variations=variations,
+            model_type=model_type,
+            use_cache=True,
+            user=user
+        ):
+            result['estimated_cost'] = self._calculate_cost(
+                prompt_tokens=result['prompt_tokens'],
+                generated_tokens=result['generated_tokens'],
+                model_type=model_type
+            )
+            yield result
+    
+    def _error_payload(self, params: Dict[str, Any], err: Exception,
+                       extras: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Build the failure result shared by the generate_* methods"""
+        payload = {
+            'success': False,
+            'error': str(err),
+            'content': [],
+            'parameters': params
+        }
+        if extras:
+            payload.update(extras)
+        return payload
+    
     def _get_max_tokens(self, length: str) -> int:
         """Get max tokens based on content length"""
         token_map = {
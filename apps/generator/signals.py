@@ -0,0 +1,40 @@
+"""
+Signal handlers for the generator app
+"""
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.generator.models import (
+    ProductCategory, ContentType, ContentTemplate, GeneratedContent, UserUsageStats
+)
+from apps.generator.storage import (
+    clear_lookup_caches, invalidate_active_content_types,
+    invalidate_templates_cache, invalidate_user_caches
+)
+
+
+@receiver([post_save, post_delete], sender=ProductCategory)
+@receiver([post_save, post_delete], sender=ContentType)
+def invalidate_lookup_caches(sender, **kwargs):
+    """Keep the in-process category/content type id caches in sync"""
+    clear_lookup_caches()
+
+
+@receiver([post_save, post_delete], sender=ContentType)
+def invalidate_content_type_filters(sender, **kwargs):
+    """Drop the cached content type list shown in the history filters"""
+    invalidate_active_content_types()
+
+
+@receiver([post_save, post_delete], sender=ContentTemplate)
+def invalidate_template_list(sender, **kwargs):
+    """Drop the cached template list shared by all users"""
+    invalidate_templates_cache()
+
+
+@receiver([post_save, post_delete], sender=UserUsageStats)
+@receiver([post_save, post_delete], sender=GeneratedContent)
+def invalidate_user_dashboard(sender, instance, **kwargs):
+    """Drop the owner's cached stats and recent content when either changes"""
+    invalidate_user_caches(instance.user_id)
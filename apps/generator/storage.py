@@ -3,9 +3,13 @@ Database service for storing and retrieving generated content
 """
 
 import logging
-from typing import Dict, List, Optional, Any
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Any
 from django.contrib.auth.models import User
-from django.db.models import Count, Sum, Q
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Case, Count, Sum, Q, F, Value, When, Prefetch
+from django.db.models.functions import Coalesce, Length, Substr
 from django.utils import timezone
 from datetime import timedelta
 from decimal import Decimal
@@ -17,104 +21,286 @@ from apps.generator.models import (
 
 logger = logging.getLogger(__name__)
 
+USER_STATS_CACHE_TIMEOUT = 60  # seconds
+DASHBOARD_CACHE_TIMEOUT = 60  # seconds
+DASHBOARD_RECENT_LIMIT = 5
+BULK_BATCH_SIZE = 500
+
+TEMPLATES_CACHE_KEY = 'content_templates'
+TEMPLATES_CACHE_TIMEOUT = 300  # seconds
+
+ACTIVE_CONTENT_TYPES_CACHE_KEY = 'active_content_types'
+ACTIVE_CONTENT_TYPES_CACHE_TIMEOUT = 3600  # seconds
+
+# Must match the expression index created in migration 0006 (PostgreSQL only)
+TEXT_SEARCH_CONFIG = 'simple'
+
+
+def _user_stats_cache_key(user_id) -> str:
+    return f"user_stats:{user_id}"
+
+
+def _dashboard_stats_cache_key(user_id) -> str:
+    return f"dashboard_stats:{user_id}"
+
+
+def _recent_content_cache_key(user_id, limit: int) -> str:
+    return f"recent_content:{user_id}:{limit}"
+
+
+def invalidate_user_caches(user_id):
+    """Drop every cached per-user stats/dashboard entry once the current transaction commits"""
+    keys = [
+        _user_stats_cache_key(user_id),
+        _dashboard_stats_cache_key(user_id),
+        _recent_content_cache_key(user_id, DASHBOARD_RECENT_LIMIT),
+    ]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate_user_stats_cache(user: User):
+    """Drop the user's cached stats and dashboard data once the current transaction commits"""
+    invalidate_user_caches(user.pk)
+
+
+@lru_cache(maxsize=512)
+def _get_category_id(name: str) -> int:
+    """Get or create a product category and return its primary key"""
+    category, _ = ProductCategory.objects.get_or_create(
+        name=name,
+        defaults={'slug': name.lower().replace(' ', '-')}
+    )
+    return category.pk
+
+
+@lru_cache(maxsize=512)
+def _get_content_type_id(name: str, platform: str) -> int:
+    """Get or create a content type and return its primary key"""
+    content_type, _ = ContentType.objects.get_or_create(
+        name=name,
+        platform=platform
+    )
+    return content_type.pk
+
+
+def get_active_content_types() -> List[Dict[str, str]]:
+    """Distinct name/platform pairs of active content types, for history filters"""
+    return cache.get_or_set(
+        ACTIVE_CONTENT_TYPES_CACHE_KEY,
+        lambda: list(ContentType.objects.filter(is_active=True).values('name', 'platform').distinct()),
+        ACTIVE_CONTENT_TYPES_CACHE_TIMEOUT
+    )
+
+
+def invalidate_active_content_types():
+    """Drop the shared content type filter list once the current transaction commits"""
+    transaction.on_commit(lambda: cache.delete(ACTIVE_CONTENT_TYPES_CACHE_KEY))
+
+
+def invalidate_templates_cache():
+    """Drop the shared template list once the current transaction commits"""
+    transaction.on_commit(lambda: cache.delete(TEMPLATES_CACHE_KEY))
+
+
+def clear_lookup_caches():
+    """Drop cached category/content type ids (e.g. after rows are changed or deleted)"""
+    _get_category_id.cache_clear()
+    _get_content_type_id.cache_clear()
+
+
+def _content_type_key(name: str, platform: str) -> str:
+    """Key used in UserUsageStats.content_type_counts"""
+    return f"{name}|{platform}"
+
+
+def _with_listing_relations(queryset):
+    """
+    Narrow a GeneratedContent listing to the columns the history/dashboard
+    templates use, loading category and content type with small IN queries
+    instead of widening every row with joined columns.
+    """
+    return queryset.select_related('request').prefetch_related(
+        Prefetch('request__category', queryset=ProductCategory.objects.only('id', 'name')),
+        Prefetch('request__content_type', queryset=ContentType.objects.only('id', 'name', 'platform'))
+    ).only(
+        'id', 'created_at', 'is_favorite', 'generated_text',
+        'request__product_name', 'request__category', 'request__content_type'
+    )
+
 
 class ContentStorageService:
     """Service for storing and managing generated content"""
     
     @staticmethod
+    def _build_generation_request(user: User, content_data: Dict[str, Any]) -> GenerationRequest:
+        """Build an unsaved GenerationRequest from a content_data dict"""
+        # Get or create category and content type (ids are cached in-process)
+        category_id = _get_category_id(content_data.get('category', 'general'))
+        content_type_id = _get_content_type_id(
+            content_data.get('content_type', 'general'),
+            content_data.get('platform', 'general')
+        )
+        
+        # Extract product information
+        product_name = content_data.get('product_name', 'Unknown Product')
+        parameters = content_data.get('parameters', {})
+        
+        return GenerationRequest(
+            user_id=user.pk,
+            product_name=product_name,
+            category_id=category_id,
+            content_type_id=content_type_id,
+            original_prompt=content_data.get('prompt_used', ''),
+            tone=parameters.get('tone', 'professional'),
+            length=parameters.get('length', 'medium'),
+            variations_count=parameters.get('variations', 1),
+            model_type=content_data.get('model_type', 'fast'),
+            max_tokens=parameters.get('max_tokens', 1000),
+            response_time=content_data.get('response_time', 0.0),
+            estimated_cost=content_data.get('estimated_cost', 0.0),
+            prompt_tokens=content_data.get('prompt_tokens', 0),
+            generated_tokens=content_data.get('tokens_used', 0),
+            status='completed'
+        )
+    
+    @staticmethod
+    def _build_generated_content(user: User, generation_request: GenerationRequest,
+                                 content_data: Dict[str, Any]) -> GeneratedContent:
+        """Build an unsaved GeneratedContent for a generation request"""
+        return GeneratedContent(
+            user_id=user.pk,
+            request=generation_request,
+            generated_text=content_data.get('content', ''),
+            model_id=content_data.get('model_type', 'unknown'),
+            variation_number=content_data.get('variation_number', 1)
+        )
+    
+    @staticmethod
+    @transaction.atomic
     def save_generated_content(user: User, content_data: Dict[str, Any]) -> GeneratedContent:
         """Save generated content to database"""
         try:
-            # Get or create category
-            category_name = content_data.get('category', 'general')
-            category, _ = ProductCategory.objects.get_or_create(
-                name=category_name,
-                defaults={'slug': category_name.lower().replace(' ', '-')}
-            )
-            
-            # Get or create content type
-            content_type_name = content_data.get('content_type', 'general')
-            platform = content_data.get('platform', 'general')
-            content_type, _ = ContentType.objects.get_or_create(
-                name=content_type_name,
-                platform=platform
-            )
-            
-            # Extract product information
-            product_name = content_data.get('product_name', 'Unknown Product')
-            parameters = content_data.get('parameters', {})
-            
             # Create generation request with all required fields
-            generation_request = GenerationRequest.objects.create(
-                user=user,
-                product_name=product_name,
-                category=category,
-                content_type=content_type,
-                original_prompt=content_data.get('prompt_used', ''),
-                tone=parameters.get('tone', 'professional'),
-                length=parameters.get('length', 'medium'),
-                variations_count=parameters.get('variations', 1),
-                model_type=content_data.get('model_type', 'fast'),
-                max_tokens=parameters.get('max_tokens', 1000),
-                response_time=content_data.get('response_time', 0.0),
-                estimated_cost=content_data.get('estimated_cost', 0.0),
-                prompt_tokens=content_data.get('prompt_tokens', 0),
-                generated_tokens=content_data.get('tokens_used', 0),
-                status='completed'
-            )
+            generation_request = ContentStorageService._build_generation_request(user, content_data)
+            generation_request.save(force_insert=True)
             
             # Create generated content
-            generated_content = GeneratedContent.objects.create(
-                user=user,
-                request=generation_request,
-                generated_text=content_data.get('content', ''),
-                model_id=content_data.get('model_type', 'unknown'),
-                variation_number=content_data.get('variation_number', 1)
+            generated_content = ContentStorageService._build_generated_content(
+                user, generation_request, content_data
             )
+            generated_content.save(force_insert=True)
             
             # Update user usage stats
             ContentStorageService._update_user_stats(user, content_data)
+            invalidate_user_stats_cache(user)
             
             logger.info(f"Saved content for user {user.username}: {generated_content.id}")  # type: ignore
             return generated_content
             
         except Exception as e:
+            # A rolled-back transaction may have taken freshly created lookup rows with it
+            clear_lookup_caches()
             logger.error(f"Failed to save content: {e}")
             raise
     
     @staticmethod
-    def _update_user_stats(user: User, content_data: Dict[str, Any]):
-        """Update user usage statistics"""
+    @transaction.atomic
+    def save_generated_contents(user: User, content_data_list: List[Dict[str, Any]]) -> List[GeneratedContent]:
+        """Save several generated content items with one multi-row INSERT per table"""
+        if not content_data_list:
+            return []
+        
         try:
-            stats, created = UserUsageStats.objects.get_or_create(
-                user=user,
-                defaults={
-                    'total_requests': 0,
-                    'successful_generations': 0,
-                    'total_estimated_cost': Decimal('0.000000'),
-                    'total_tokens_used': 0,
-                    'total_content_pieces': 0
-                }
-            )
+            requests = [
+                ContentStorageService._build_generation_request(user, content_data)
+                for content_data in content_data_list
+            ]
+            GenerationRequest.objects.bulk_create(requests, batch_size=BULK_BATCH_SIZE)
             
-            # Only increment content pieces (not successful_generations since that's handled in views)
-            stats.total_content_pieces += 1
+            # Primary keys are client-side UUIDs, so they are set before the insert
+            generated_contents = [
+                ContentStorageService._build_generated_content(user, generation_request, content_data)
+                for generation_request, content_data in zip(requests, content_data_list)
+            ]
+            GeneratedContent.objects.bulk_create(generated_contents, batch_size=BULK_BATCH_SIZE)
             
-            # Convert cost to Decimal to avoid type mismatch
-            cost = content_data.get('estimated_cost', 0.0)
-            if isinstance(cost, (int, float)):
-                cost = Decimal(str(cost))
-            elif not isinstance(cost, Decimal):
-                cost = Decimal('0.000000')
+            ContentStorageService._update_user_stats_batch(user, content_data_list)
+            invalidate_user_stats_cache(user)
             
-            stats.total_estimated_cost += cost
-            stats.total_tokens_used += int(content_data.get('tokens_used', 0))
-            stats.last_usage = timezone.now()
+            logger.debug("Saved %d content items for user %s", len(generated_contents), user.pk)
+            return generated_contents
             
-            if not stats.first_usage:
-                stats.first_usage = timezone.now()
+        except Exception as e:
+            clear_lookup_caches()
+            logger.error(f"Failed to save content batch: {e}")
+            raise
+    
+    @staticmethod
+    def _update_user_stats(user: User, content_data: Dict[str, Any]):
+        """Update user usage statistics"""
+        ContentStorageService._update_user_stats_batch(user, [content_data])
+    
+    @staticmethod
+    def _update_user_stats_batch(user: User, content_data_list: List[Dict[str, Any]]):
+        """Update user usage statistics for one or more saved content items"""
+        try:
+            pieces = len(content_data_list)
+            cost = Decimal('0.000000')
+            tokens = 0
+            type_counts: Dict[str, int] = {}
+            for content_data in content_data_list:
+                # Convert cost to Decimal to avoid type mismatch
+                item_cost = content_data.get('estimated_cost', 0.0)
+                if isinstance(item_cost, (int, float)):
+                    item_cost = Decimal(str(item_cost))
+                elif not isinstance(item_cost, Decimal):
+                    item_cost = Decimal('0.000000')
+                cost += item_cost
                 
-            stats.save()
+                tokens += int(content_data.get('tokens_used', 0))
+                type_key = _content_type_key(
+                    content_data.get('content_type', 'general'),
+                    content_data.get('platform', 'general')
+                )
+                type_counts[type_key] = type_counts.get(type_key, 0) + 1
+            
+            now = timezone.now()
+            
+            # Only increment content pieces (not successful_generations since that's handled in views).
+            # A single UPDATE with F() expressions avoids the SELECT and the lost-update race.
+            increments = {
+                'total_content_pieces': F('total_content_pieces') + pieces,
+                'total_estimated_cost': F('total_estimated_cost') + cost,
+                'total_tokens_used': F('total_tokens_used') + tokens,
+                'last_usage': now,
+                'first_usage': Coalesce('first_usage', Value(now)),
+            }
+            
+            # Savepoint so a failure here doesn't break the caller's transaction.
+            # The row is locked so the per-type counter dict can't lose concurrent increments.
+            with transaction.atomic():
+                stats, created = UserUsageStats.objects.select_for_update().only(
+                    'id', 'content_type_counts'
+                ).get_or_create(
+                    user=user,
+                    defaults={
+                        'total_content_pieces': pieces,
+                        'total_estimated_cost': cost,
+                        'total_tokens_used': tokens,
+                        'content_type_counts': type_counts,
+                        'first_usage': now,
+                        'last_usage': now
+                    }
+                )
+                if not created:
+                    counts = stats.content_type_counts or {}
+                    for type_key, count in type_counts.items():
+                        counts[type_key] = counts.get(type_key, 0) + count
+                    UserUsageStats.objects.filter(pk=stats.pk).update(
+                        content_type_counts=counts, **increments
+                    )
+            
+            invalidate_user_stats_cache(user)
             
         except Exception as e:
             logger.error(f"Failed to update user stats: {e}")
@@ -125,7 +311,7 @@ class ContentStorageService:
                                limit: int = 50) -> List[GeneratedContent]:
         """Get user's content generation history"""
         try:
-            queryset = GeneratedContent.objects.filter(user=user)
+            queryset = GeneratedContent.objects.filter(user=user, is_deleted=False)
             
             if content_type:
                 queryset = queryset.filter(request__content_type__name=content_type)
@@ -133,20 +319,75 @@ class ContentStorageService:
             if platform:
                 queryset = queryset.filter(request__content_type__platform=platform)
             
-            return list(queryset.select_related(
-                'request__category', 'request__content_type', 'request'
-            ).order_by('-created_at')[:limit])
+            return list(_with_listing_relations(queryset).order_by('-created_at')[:limit])
             
         except Exception as e:
             logger.error(f"Failed to get user history: {e}")
             return []
     
+    @staticmethod
+    def get_dashboard_recent_content(user: User) -> List[GeneratedContent]:
+        """Latest content for the dashboard (cached briefly per user)"""
+        return cache.get_or_set(
+            _recent_content_cache_key(user.pk, DASHBOARD_RECENT_LIMIT),
+            lambda: ContentStorageService.get_user_content_history(user=user, limit=DASHBOARD_RECENT_LIMIT),
+            DASHBOARD_CACHE_TIMEOUT
+        )
+    
+    @staticmethod
+    def get_dashboard_stats(user: User) -> Dict[str, Any]:
+        """Usage counters shown on the dashboard (cached briefly per user)"""
+        def load():
+            stats_obj, _ = UserUsageStats.objects.get_or_create(user=user)
+            return {
+                'daily_requests_used': stats_obj.daily_requests_used,
+                'daily_request_limit': stats_obj.daily_request_limit,
+                'monthly_requests_used': stats_obj.monthly_requests_used,
+                'monthly_request_limit': stats_obj.monthly_request_limit,
+                'successful_generations': stats_obj.successful_generations,
+                'last_daily_reset': stats_obj.last_daily_reset,
+            }
+        
+        return cache.get_or_set(_dashboard_stats_cache_key(user.pk), load, DASHBOARD_CACHE_TIMEOUT)
+    
+    @staticmethod
+    def iter_user_content(user: User, content_ids: Optional[List[str]] = None,
+                          content_type: Optional[str] = None,
+                          platform: Optional[str] = None,
+                          chunk_size: int = 500) -> Iterator[GeneratedContent]:
+        """
+        Stream a user's content for exports without materializing the whole result.
+        Rows are fetched in chunks (server-side cursor on PostgreSQL).
+        """
+        queryset = GeneratedContent.objects.filter(user=user, is_deleted=False)
+        
+        if content_ids is not None:
+            queryset = queryset.filter(id__in=content_ids)
+        
+        if content_type:
+            queryset = queryset.filter(request__content_type__name=content_type)
+        
+        if platform:
+            queryset = queryset.filter(request__content_type__platform=platform)
+        
+        return queryset.select_related(
+            'request__category', 'request__content_type'
+        ).only(
+            'id', 'generated_text', 'edited_text', 'is_favorite', 'created_at', 'updated_at',
+            'request__product_name', 'request__category__name', 'request__content_type__name'
+        ).order_by('-created_at').iterator(chunk_size=chunk_size)
+    
     @staticmethod
     def get_user_stats(user: User) -> Dict[str, Any]:
-        """Get comprehensive user statistics"""
+        """Get comprehensive user statistics (cached briefly per user)"""
+        cache_key = _user_stats_cache_key(user.pk)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            # Get basic stats
-            user_stats = UserUsageStats.objects.filter(user=user).first()
+            # Get basic stats (OneToOne reverse accessor; reuses the row if already loaded on the user)
+            user_stats = getattr(user, 'userusagestats', None)
             if not user_stats:
                 return {
                     'total_generations': 0,
@@ -156,24 +397,40 @@ class ContentStorageService:
                     'recent_activity': []
                 }
             
-            # Get content breakdown by type
-            content_by_type = GeneratedContent.objects.filter(user=user).values(
-                'request__content_type__name', 'request__content_type__platform'
-            ).annotate(count=Count('id')).order_by('-count')
+            # Content breakdown by type, maintained incrementally on save/delete
+            content_by_type = []
+            for key, count in (user_stats.content_type_counts or {}).items():
+                if count <= 0:
+                    continue
+                name, _, platform = key.partition('|')
+                content_by_type.append({
+                    'request__content_type__name': name,
+                    'request__content_type__platform': platform,
+                    'count': count
+                })
+            content_by_type.sort(key=lambda row: row['count'], reverse=True)
             
             # Get recent activity (last 30 days)
             thirty_days_ago = timezone.now() - timedelta(days=30)
+            # Only the first 101 characters of the text are fetched for the preview
             recent_content = GeneratedContent.objects.filter(
                 user=user,
+                is_deleted=False,
                 created_at__gte=thirty_days_ago
+            ).select_related('request__content_type').annotate(
+                preview_text=Substr('generated_text', 1, 101),
+                text_length=Length('generated_text')
+            ).only(
+                'id', 'created_at', 'request__product_name',
+                'request__content_type__name', 'request__content_type__platform'
             ).order_by('-created_at')[:10]
             
-            return {
+            result = {
                 'total_generations': user_stats.successful_generations,
                 'total_cost': float(user_stats.total_estimated_cost),
                 'total_tokens': user_stats.total_tokens_used,
                 'last_generation': user_stats.last_usage,
-                'content_by_type': list(content_by_type),
+                'content_by_type': content_by_type,
                 'recent_activity': [
                     {
                         'id': str(content.id),
@@ -181,11 +438,13 @@ class ContentStorageService:
                         'content_type': content.request.content_type.name,
                         'platform': content.request.content_type.platform,
                         'created_at': content.created_at,
-                        'preview': content.generated_text[:100] + '...' if len(content.generated_text) > 100 else content.generated_text
+                        'preview': content.preview_text[:100] + '...' if content.text_length > 100 else content.preview_text
                     }
                     for content in recent_content
                 ]
             }
+            cache.set(cache_key, result, USER_STATS_CACHE_TIMEOUT)
+            return result
             
         except Exception as e:
             logger.error(f"Failed to get user stats: {e}")
@@ -196,7 +455,9 @@ class ContentStorageService:
                         is_public: bool = False) -> ContentTemplate:
         """Save generated content as a reusable template"""
         try:
-            content = GeneratedContent.objects.get(id=content_id, user=user)
+            content = GeneratedContent.objects.select_related(
+                'request__content_type', 'request__category'
+            ).get(id=content_id, user=user, is_deleted=False)
             
             template = ContentTemplate.objects.create(
                 user=user,
@@ -220,11 +481,15 @@ class ContentStorageService:
     
     @staticmethod
     def get_user_templates(user: User) -> List[ContentTemplate]:
-        """Get user's saved templates"""
+        """Get templates available to the user"""
         try:
-            return list(ContentTemplate.objects.filter(
-                Q(user=user) | Q(is_public=True)
-            ).select_related('content_type').order_by('-created_at'))
+            # ContentTemplate rows are not owned by a user, so every user sees the same
+            # list; it is cached once for everyone and dropped when a template changes.
+            return cache.get_or_set(
+                TEMPLATES_CACHE_KEY,
+                lambda: list(ContentTemplate.objects.select_related('content_type').order_by('-created_at')),
+                TEMPLATES_CACHE_TIMEOUT
+            )
             
         except Exception as e:
             logger.error(f"Failed to get templates: {e}")
@@ -232,40 +497,90 @@ class ContentStorageService:
     
     @staticmethod
     def delete_content(user: User, content_id: int) -> bool:
-        """Delete generated content"""
+        """
+        Soft-delete generated content. The row is only flagged here; the
+        purge_deleted_content management command removes it later.
+        """
         try:
-            content = GeneratedContent.objects.get(id=content_id, user=user)
-            content.delete()
-            
-            # Update user stats
-            stats = UserUsageStats.objects.filter(user=user).first()
-            if stats and stats.successful_generations > 0:
-                stats.successful_generations -= 1
-                stats.total_content_pieces -= 1
-                stats.save()
+            # The flag and the stats update commit or roll back together
+            with transaction.atomic():
+                live_content = GeneratedContent.objects.filter(id=content_id, user=user, is_deleted=False)
+                content_type = live_content.values_list(
+                    'request__content_type__name', 'request__content_type__platform'
+                ).first()
+                if content_type is None:
+                    return False
+                
+                now = timezone.now()
+                if not live_content.update(is_deleted=True, deleted_at=now, updated_at=now):
+                    return False
+                
+                # Lock the stats row so the per-type counter dict can't lose concurrent updates
+                stats = UserUsageStats.objects.select_for_update().only(
+                    'id', 'content_type_counts'
+                ).filter(user=user).first()
+                if stats:
+                    counts = stats.content_type_counts or {}
+                    type_key = _content_type_key(*content_type)
+                    if counts.get(type_key, 0) > 0:
+                        counts[type_key] -= 1
+                    
+                    # Counters are only decremented while successful_generations > 0, checked in SQL
+                    has_generations = Q(successful_generations__gt=0)
+                    UserUsageStats.objects.filter(pk=stats.pk).update(
+                        content_type_counts=counts,
+                        successful_generations=Case(
+                            When(has_generations, then=F('successful_generations') - 1),
+                            default=F('successful_generations')
+                        ),
+                        total_content_pieces=Case(
+                            When(has_generations, then=F('total_content_pieces') - 1),
+                            default=F('total_content_pieces')
+                        )
+                    )
+                
+                invalidate_user_stats_cache(user)
             
             logger.info(f"Deleted content {content_id} for user {user.pk}")  # type: ignore[reportAttributeAccessIssue]
             return True
             
-        except GeneratedContent.DoesNotExist:
-            return False
         except Exception as e:
             logger.error(f"Failed to delete content: {e}")
             return False
     
+    @staticmethod
+    def purge_deleted_content(older_than: timedelta = timedelta(days=30),
+                              batch_size: int = BULK_BATCH_SIZE) -> int:
+        """Permanently remove content soft-deleted before the cutoff, in batches"""
+        cutoff = timezone.now() - older_than
+        purged = 0
+        while True:
+            batch_ids = list(GeneratedContent.objects.filter(
+                is_deleted=True, deleted_at__lt=cutoff
+            ).values_list('id', flat=True)[:batch_size])
+            if not batch_ids:
+                break
+            GeneratedContent.objects.filter(id__in=batch_ids).delete()
+            purged += len(batch_ids)
+        
+        logger.info(f"Purged {purged} soft-deleted content items")
+        return purged
+    
     @staticmethod
     def mark_as_favorite(user: User, content_id: int, is_favorite: bool = True) -> bool:
         """Mark content as favorite"""
         try:
-            content = GeneratedContent.objects.get(id=content_id, user=user)
-            content.is_favorite = is_favorite
-            content.save()
+            # No row is loaded; 0 updated rows means not found or owned by another user.
+            # updated_at is set explicitly since queryset updates skip auto_now.
+            updated = GeneratedContent.objects.filter(
+                id=content_id, user=user, is_deleted=False
+            ).update(is_favorite=is_favorite, updated_at=timezone.now())
             
-            logger.info(f"Updated favorite status for content {content_id}")
-            return True
+            if updated:
+                invalidate_user_stats_cache(user)
+                logger.info(f"Updated favorite status for content {content_id}")
+            return updated > 0
             
-        except GeneratedContent.DoesNotExist:
-            return False
         except Exception as e:
             logger.error(f"Failed to update favorite status: {e}")
             return False
@@ -274,20 +589,35 @@ class ContentStorageService:
     def search_content(user: User, query: str, content_type: Optional[str] = None) -> List[GeneratedContent]:
         """Search user's generated content"""
         try:
-            queryset = GeneratedContent.objects.filter(user=user)
+            queryset = GeneratedContent.objects.filter(user=user, is_deleted=False)
             
             if content_type:
-                queryset = queryset.filter(content_type__name=content_type)
-            
-            # Search in product name and generated text
-            queryset = queryset.filter(
-                Q(request__product_name__icontains=query) |
-                Q(generated_text__icontains=query)
-            )
+                queryset = queryset.filter(request__content_type__name=content_type)
             
-            return list(queryset.select_related(
-                'request__category', 'request__content_type'
-            ).order_by('-created_at')[:20])
+            if connection.vendor == 'postgresql':
+                from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+                
+                # Full-text match on the generated text (served by the GIN expression index)
+                vector = SearchVector('generated_text', config=TEXT_SEARCH_CONFIG)
+                search_query = SearchQuery(query, config=TEXT_SEARCH_CONFIG, search_type='websearch')
+                text_matches = GeneratedContent.objects.annotate(
+                    search=vector
+                ).filter(search=search_query).values('id')
+                
+                queryset = queryset.filter(
+                    Q(request__product_name__icontains=query) |
+                    Q(id__in=text_matches)
+                ).annotate(rank=SearchRank(vector, search_query))
+                ordering = ('-rank', '-created_at')
+            else:
+                # Search in product name and generated text
+                queryset = queryset.filter(
+                    Q(request__product_name__icontains=query) |
+                    Q(generated_text__icontains=query)
+                )
+                ordering = ('-created_at',)
+            
+            return list(_with_listing_relations(queryset).order_by(*ordering)[:20])
             
         except Exception as e:
             logger.error(f"Failed to search content: {e}")
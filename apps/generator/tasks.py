@@ -0,0 +1,348 @@
+"""
+Celery tasks for content generation.
+
+Bedrock round-trips take seconds, so generation runs on Celery workers
+instead of holding a web worker. Each task returns ``{'user_id', 'result'}``
+so the status endpoint only hands results back to the user who asked for them.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from celery import shared_task
+from django.contrib.auth import get_user_model
+from django.db import connection
+
+from apps.generator.services import ContentGenerationService
+from apps.generator.storage import ContentStorageService
+from apps.generator.models import UserUsageStats
+from utils.bedrock_client import BedrockClient
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on concurrent Bedrock calls for one multi-type headline request
+MAX_HEADLINE_WORKERS = 8
+
+
+def _failed_result():
+    return {
+        'success': False,
+        'error': 'Internal server error',
+        'content': []
+    }
+
+
+def _record_usage(user_id, success):
+    usage_stats, _ = UserUsageStats.objects.get_or_create(user_id=user_id)
+    usage_stats.increment_request_count(success=success)
+
+
+def _save_variations(user, result, content_type, platform, product_info, model_type):
+    """Auto-save every generated variation as its own history record"""
+    try:
+        # Fields shared by every variation are built once
+        base_content_data = {
+            'content_type': content_type,
+            'product_name': product_info.get('name', 'Unknown Product'),
+            'platform': platform,
+            'category': product_info.get('category', 'general'),
+            'request_data': {
+                'product_info': product_info,
+                'generation_parameters': result['parameters']
+            },
+            'parameters': result['parameters'],
+            'prompt_used': result.get('prompt_used', ''),
+        }
+        content_data_list = [
+            {
+                **base_content_data,
+                'content': content_item['text'],
+                'estimated_cost': content_item.get('estimated_cost', 0.0),
+                'tokens_used': content_item.get('generated_tokens', 0),
+                'model_type': content_item.get('model_type', model_type),
+                'response_time': content_item.get('response_time', 0.0)
+            }
+            for content_item in result['content']
+        ]
+
+        # One multi-row INSERT for all variations instead of one per item
+        ContentStorageService.save_generated_contents(
+            user=user,
+            content_data_list=content_data_list
+        )
+
+        logger.debug("Auto-saved %d %s(s) for user %s", len(result['content']), content_type, user.id)
+
+    except Exception as save_error:
+        logger.error("Failed to auto-save %s: %s", content_type, save_error)
+        # Don't fail the generation if save fails, just log it
+
+
+@shared_task
+def generate_product_description_task(user_id, payload, auto_save=False):
+    """Generate product descriptions; payload holds the service keyword arguments"""
+    user = get_user_model().objects.get(pk=user_id)
+
+    try:
+        result = ContentGenerationService.shared().generate_product_description(user=user, **payload)
+    except Exception as e:
+        logger.error("Product description generation error: %s", e)
+        result = _failed_result()
+
+    _record_usage(user_id, result['success'])
+
+    if auto_save and result['success']:
+        _save_variations(
+            user, result, 'product_description', 'general',
+            payload['product_info'], payload.get('model_type', 'fast')
+        )
+
+    return {'user_id': user_id, 'result': result}
+
+
+@shared_task
+def generate_social_media_task(user_id, payload, auto_save=False):
+    """Generate social media captions; payload holds the service keyword arguments"""
+    user = get_user_model().objects.get(pk=user_id)
+
+    try:
+        result = ContentGenerationService.shared().generate_social_media_caption(**payload)
+    except Exception as e:
+        logger.error("Social media generation error: %s", e)
+        result = _failed_result()
+
+    _record_usage(user_id, result['success'])
+
+    if auto_save and result['success']:
+        _save_variations(
+            user, result, 'social_media_caption', payload.get('platform', 'instagram'),
+            payload['product_info'], payload.get('model_type', 'fast')
+        )
+
+    return {'user_id': user_id, 'result': result}
+
+
+def _generate_headline_type(service, **kwargs):
+    """Thread worker for one headline type; usage tracking may open a DB connection here"""
+    try:
+        return service.generate_marketing_headline(**kwargs)
+    finally:
+        connection.close()
+
+
+@shared_task
+def generate_headline_task(user_id, payload, auto_save=False):
+    """
+    Generate headlines for every requested headline type, spreading the
+    requested number of variations across the types.
+    """
+    user = get_user_model().objects.get(pk=user_id)
+    product_info = payload['product_info']
+    headline_types = payload['headline_types']
+    usage_context = payload.get('usage_context', 'website')
+    character_limit = payload.get('character_limit')
+    tone = payload.get('tone', 'professional')
+    model_type = payload.get('model_type', 'quality')
+    total_variations = payload.get('variations', 5)
+
+    try:
+        service = ContentGenerationService.shared()
+        all_results = []
+
+        # Calculate variations per headline type
+        num_types = len(headline_types)
+        variations_per_type = max(1, total_variations // num_types)
+        remaining_variations = total_variations % num_types
+
+        # Distribute remaining variations to first few types
+        variation_counts = [
+            variations_per_type + (1 if i < remaining_variations else 0)
+            for i in range(num_types)
+        ]
+
+        # Each type is an independent Bedrock call, so run them side by side
+        with ThreadPoolExecutor(max_workers=min(MAX_HEADLINE_WORKERS, num_types)) as executor:
+            futures = [
+                executor.submit(
+                    _generate_headline_type,
+                    service,
+                    product_info=product_info,
+                    headline_type=headline_type,
+                    usage_context=usage_context,
+                    character_limit=character_limit,
+                    tone=tone,
+                    model_type=model_type,
+                    variations=current_variations,
+                    additional_instructions=payload.get('additional_instructions', '')
+                )
+                for headline_type, current_variations in zip(headline_types, variation_counts)
+            ]
+            results = [future.result() for future in futures]
+
+        total_cost = 0.0
+        total_time = 0.0
+
+        for headline_type, result in zip(headline_types, results):
+            if result['success']:
+                # Add headline type to each content item
+                for content_item in result['content']:
+                    content_item['headline_type'] = headline_type
+                    content_item['text'] = content_item.get('headline_text', content_item.get('text', ''))
+
+                all_results.extend(result['content'])
+                total_cost += sum(float(item.get('estimated_cost', 0)) for item in result['content'])
+                total_time += sum(float(item.get('response_time', 0)) for item in result['content'])
+    except Exception as e:
+        logger.error("Headlines generation error: %s", e)
+        _record_usage(user_id, False)
+        return {'user_id': user_id, 'result': _failed_result()}
+
+    _record_usage(user_id, bool(all_results))
+
+    if not all_results:
+        return {
+            'user_id': user_id,
+            'result': {
+                'success': False,
+                'error': 'Failed to generate any headlines',
+                'content': []
+            }
+        }
+
+    # Combine all results
+    final_result = {
+        'success': True,
+        'content': all_results,
+        'parameters': {
+            'headline_types': headline_types,
+            'usage_context': usage_context,
+            'character_limit': character_limit,
+            'tone': tone,
+            'variations': total_variations,
+            'model_type': model_type
+        },
+        'total_cost': total_cost,
+        'total_time': total_time
+    }
+
+    if auto_save:
+        # Save as a single database record with all headlines combined
+        try:
+            type_labels = {
+                headline_type: headline_type.replace('_', ' ').title()
+                for headline_type in headline_types
+            }
+            combined_content = '\n\n'.join(
+                f"{i}. [{type_labels[item['headline_type']]}] {item.get('text', '')}"
+                for i, item in enumerate(all_results, 1)
+            )
+
+            content_data = {
+                'content': combined_content,
+                'content_type': 'marketing_headline',
+                'product_name': product_info.get('name', 'Unknown Product'),
+                'platform': usage_context,
+                'category': product_info.get('category', 'general'),
+                'request_data': {
+                    'product_info': product_info,
+                    'generation_parameters': final_result['parameters'],
+                    'headline_types': headline_types,
+                    'individual_headlines': [
+                        {
+                            'text': item.get('text', ''),
+                            'type': item.get('headline_type', 'general'),
+                            'cost': item.get('estimated_cost', 0.0),
+                            'tokens': item.get('generated_tokens', 0)
+                        } for item in all_results
+                    ]
+                },
+                'parameters': final_result['parameters'],
+                'estimated_cost': total_cost,
+                'tokens_used': sum(item.get('generated_tokens', 0) for item in all_results),
+                'prompt_used': f"Generated {len(all_results)} headlines for types: {', '.join(headline_types)}",
+                'model_type': model_type,
+                'response_time': total_time
+            }
+
+            ContentStorageService.save_generated_content(
+                user=user,
+                content_data=content_data
+            )
+
+            logger.debug("Saved 1 record with %d headlines for user %s", len(all_results), user_id)
+
+        except Exception as save_error:
+            logger.error("Failed to save headline content: %s", save_error)
+            # Don't fail the generation if save fails, just log it
+
+    return {'user_id': user_id, 'result': final_result}
+
+
+# Service calls for the generic API endpoint, keyed by content type
+API_GENERATORS = {
+    'product_description': lambda service, data: service.generate_product_description(
+        product_info=data.get('product_info', {}),
+        length=data.get('length', 'medium'),
+        tone=data.get('tone', 'professional'),
+        model_type=data.get('model_type', 'fast'),
+        variations=data.get('variations', 1)
+    ),
+    'social_media_caption': lambda service, data: service.generate_social_media_caption(
+        product_info=data.get('product_info', {}),
+        platform=data.get('platform', 'instagram'),
+        length=data.get('length', 'medium'),
+        model_type=data.get('model_type', 'fast'),
+        variations=data.get('variations', 1)
+    ),
+    'marketing_headline': lambda service, data: service.generate_marketing_headline(
+        product_info=data.get('product_info', {}),
+        headline_type=data.get('headline_type', 'attention_grabbing'),
+        usage_context=data.get('usage_context', 'website'),
+        character_limit=data.get('character_limit'),
+        tone=data.get('tone', 'professional'),
+        model_type=data.get('model_type', 'quality'),
+        variations=data.get('variations', 5),
+        additional_instructions=data.get('additional_instructions', '')
+    ),
+    'email_content': lambda service, data: service.generate_email_content(
+        product_info=data.get('product_info', {}),
+        email_type=data.get('email_type', 'promotional'),
+        tone=data.get('tone', 'friendly'),
+        model_type=data.get('model_type', 'fast')
+    ),
+    'website_copy': lambda service, data: service.generate_website_copy(
+        product_info=data.get('product_info', {}),
+        section=data.get('section', 'hero'),
+        tone=data.get('tone', 'professional'),
+        model_type=data.get('model_type', 'fast')
+    ),
+}
+
+
+@shared_task
+def generate_api_content_task(user_id, content_type, data):
+    """Run one of the API_GENERATORS; the caller validates content_type"""
+    try:
+        result = API_GENERATORS[content_type](ContentGenerationService.shared(), data)
+    except Exception as e:
+        logger.error("API content generation error: %s", e)
+        result = {
+            'success': False,
+            'error': 'Internal server error'
+        }
+
+    return {'user_id': user_id, 'result': result}
+
+
+@shared_task(ignore_result=True)
+def refresh_bedrock_cache_task(prompt, model_type, max_tokens):
+    """Regenerate a stale Bedrock cache entry that is still being served to users"""
+    try:
+        BedrockClient().generate_content(
+            prompt=prompt,
+            model_type=model_type,
+            max_tokens=max_tokens,
+            refresh=True
+        )
+    except Exception as e:
+        logger.warning("Bedrock cache refresh failed: %s", e)
@@ -20,6 +20,7 @@ urlpatterns = [
     
     # API endpoints
     path('api/generate/', views.api_generate_content, name='api_generate'),
+    path('api/tasks/<str:task_id>/', views.task_status, name='task_status'),
     path('api/save/', views.api_save_content, name='api_save_content'),
     path('api/ab-test/', views.generate_ab_test, name='generate_ab_test'),
     path('api/test-connection/', views.test_connection, name='test_connection'),
@@ -1,41 +1,132 @@
 from django.shortcuts import render, redirect
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse, HttpRequest, HttpResponse
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import require_http_methods, condition
+from django.views.decorators.vary import vary_on_cookie
+from django.db.models import Count, Max
 from django.core.paginator import Paginator
 from typing import Union
+from celery.result import AsyncResult
 from django.utils import timezone
 from datetime import timedelta
-import json
 import logging
+import random
+import re
+import uuid
+
+import orjson
 
 from apps.generator.services import ContentGenerationService, ContentAnalyzer
-from apps.generator.storage import ContentStorageService
+from apps.generator.storage import ContentStorageService, get_active_content_types
 from apps.generator.export import ContentExporter
+from apps.generator.responses import OrjsonResponse, ndjson_lines
 from apps.generator.models import GeneratedContent, UserUsageStats
 from apps.generator.decorators import check_user_limit
+from apps.generator.tasks import (
+    API_GENERATORS,
+    generate_api_content_task,
+    generate_headline_task,
+    generate_product_description_task,
+    generate_social_media_task,
+)
 from utils.bedrock_client import BedrockClientError
 
 logger = logging.getLogger(__name__)
 
 
+# Indonesian tone values -> English keys used for validation
+TONE_MAPPING = {
+    'profesional': 'professional',
+    'kasual': 'casual', 
+    'energik': 'energetic',
+    'mewah': 'luxury',
+    'ramah': 'friendly',
+    'inspiratif': 'modern',     # Map inspiratif to modern as closest match
+    'playful': 'friendly',      # Map playful to friendly as closest match  
+    'edukatif': 'traditional'   # Map edukatif to traditional as closest match
+}
+
+
 def _map_tone_to_english(tone: str) -> str:
     """Map Indonesian tone values to English keys for validation"""
-    tone_mapping = {
-        'profesional': 'professional',
-        'kasual': 'casual', 
-        'energik': 'energetic',
-        'mewah': 'luxury',
-        'ramah': 'friendly',
-        'inspiratif': 'modern',     # Map inspiratif to modern as closest match
-        'playful': 'friendly',      # Map playful to friendly as closest match  
-        'edukatif': 'traditional'   # Map edukatif to traditional as closest match
-    }
+    return TONE_MAPPING.get(tone, tone)
+
+
+def _content_state_etag(request):
+    """
+    ETag for pages derived from the user's saved content and usage stats.
+    Changes whenever content is added, deleted or edited, or usage is recorded.
+    """
+    summary = GeneratedContent.objects.filter(user=request.user, is_deleted=False).aggregate(
+        count=Count('id'), latest=Max('updated_at')
+    )
+    last_usage = UserUsageStats.objects.filter(user=request.user).values_list(
+        'last_usage', flat=True
+    ).first()
+    latest = summary['latest']
+    return (
+        f"{request.user.pk}-{summary['count']}-"
+        f"{latest.timestamp() if latest else 0}-"
+        f"{last_usage.timestamp() if last_usage else 0}"
+    )
+
+
+def _content_last_modified(request, content_id):
+    """Last-Modified for a single content item"""
+    return GeneratedContent.objects.filter(id=content_id, user=request.user, is_deleted=False).values_list(
+        'updated_at', flat=True
+    ).first()
+
+
+def _dispatch_generation(request, task, *args, **kwargs):
+    """
+    Queue a generation task for the current user.
+    Returns (async_result, result); result is None while the task is still running.
+    """
+    async_result = task.delay(request.user.pk, *args, **kwargs)
+    if async_result.ready():
+        # Eager mode (no broker configured): the task already ran in this process
+        return async_result, async_result.get()['result']
+    return async_result, None
+
+
+def _pending_response(request, async_result):
+    """Tell the client where to poll for a task that is still running"""
+    status_url = reverse('generator:task_status', args=[async_result.id])
+    if request.content_type == 'application/json' or 'api' in request.path:
+        return OrjsonResponse({
+            'success': True,
+            'status': 'pending',
+            'task_id': async_result.id,
+            'status_url': status_url
+        }, status=202)
+    return render(request, 'generator/generating.html', {
+        'task_id': async_result.id,
+        'status_url': status_url
+    })
+
+
+def _render_generator_result(request, result, is_json, product_info, data,
+                             result_template, form_template, success_message,
+                             failure_message=None):
+    """Respond to a finished generation: the raw result for JSON, otherwise a page with a flash message"""
+    if is_json:
+        return OrjsonResponse(result)
     
-    # Convert tone to English if it's in Indonesian
-    return tone_mapping.get(tone, tone)
+    if result['success']:
+        messages.success(request, success_message)
+        context = {
+            'result': result,
+            'product_info': product_info,
+            'form_data': data
+        }
+        return render(request, result_template, context)
+    
+    messages.error(request, failure_message or f"Generation failed: {result['error']}")
+    return render(request, form_template, {'form_data': data})
 
 
 @login_required
@@ -43,20 +134,17 @@ def generator_dashboard(request):
     """Main generator dashboard"""
     # Get recent content for the user
     try:
-        recent_content = ContentStorageService.get_user_content_history(
-            user=request.user,
-            limit=5  # Show last 5 items
-        )
+        recent_content = ContentStorageService.get_dashboard_recent_content(request.user)
     except Exception as e:
         logger.error(f"Failed to get recent content for dashboard: {e}")
         recent_content = []
     
-    # Get or create user stats
+    # Get user stats (cached; the countdown is always computed fresh)
     try:
-        stats_obj, created = UserUsageStats.objects.get_or_create(user=request.user)
+        user_stats = dict(ContentStorageService.get_dashboard_stats(request.user))
         
         # Calculate daily reset time
-        reset_time = stats_obj.last_daily_reset + timedelta(days=1)
+        reset_time = user_stats.pop('last_daily_reset') + timedelta(days=1)
         time_left = reset_time - timezone.now()
         
         # Format time left for display
@@ -67,16 +155,9 @@ def generator_dashboard(request):
         else:
             daily_reset_time_left = "segera"
 
-        user_stats = {
-            'daily_requests_used': stats_obj.daily_requests_used,
-            'daily_request_limit': stats_obj.daily_request_limit,
-            'monthly_requests_used': stats_obj.monthly_requests_used,
-            'monthly_request_limit': stats_obj.monthly_request_limit,
-            'successful_generations': stats_obj.successful_generations,
-            'daily_reset_time_left': daily_reset_time_left,
-        }
+        user_stats['daily_reset_time_left'] = daily_reset_time_left
         
-        logger.info(f"Dashboard user_stats for {request.user.username}: {user_stats}")
+        logger.debug("Dashboard user_stats for user %s: %s", request.user.pk, user_stats)
         
     except Exception as e:
         logger.error(f"Failed to get user stats for dashboard: {e}")
@@ -106,15 +187,13 @@ def product_description_generator(request):
     if request.method == 'GET':
         return render(request, 'generator/product_description.html')
     
-    # Increment request count for the user
-    usage_stats, _ = UserUsageStats.objects.get_or_create(user=request.user)
+    # Loaded by @check_user_limit
+    usage_stats = request.user_usage_stats
+    is_json = request.content_type == 'application/json'
     
     try:
         # Parse request data
-        if request.content_type == 'application/json':
-            data = json.loads(request.body)
-        else:
-            data = request.POST.dict()
+        data = orjson.loads(request.body) if is_json else request.POST.dict()
         
         # Extract product information
         product_info = {
@@ -127,79 +206,35 @@ def product_description_generator(request):
             'unique_selling_point': data.get('unique_selling_point', '')
         }
         
-        # Extract generation parameters
-        length = data.get('length', 'medium')
-        tone = data.get('tone', 'professional')
-        model_type = data.get('model_type', 'fast')
-        variations = int(data.get('variations', 1))
-        
-        # Generate content
-        service = ContentGenerationService()
-        result = service.generate_product_description(
-            product_info=product_info,
-            length=length,
-            tone=tone,
-            model_type=model_type,
-            variations=variations,
-            user=request.user
-        )
-        
-        # Increment usage stats on successful generation
-        usage_stats.increment_request_count(success=result['success'])
+        payload = {
+            'product_info': product_info,
+            'length': data.get('length', 'medium'),
+            'tone': data.get('tone', 'professional'),
+            'model_type': data.get('model_type', 'fast'),
+            'variations': int(data.get('variations', 1))
+        }
         
-        if request.content_type == 'application/json':
-            return JsonResponse(result)
-        else:
-            if result['success']:
-                # Auto-save generated content to database
-                try:
-                    for content_item in result['content']:
-                        content_data = {
-                            'content': content_item['text'],
-                            'content_type': 'product_description',
-                            'product_name': product_info.get('name', 'Unknown Product'),
-                            'platform': 'general',
-                            'category': product_info.get('category', 'general'),
-                            'request_data': {
-                                'product_info': product_info,
-                                'generation_parameters': result['parameters']
-                            },
-                            'parameters': result['parameters'],
-                            'estimated_cost': content_item.get('estimated_cost', 0.0),
-                            'tokens_used': content_item.get('generated_tokens', 0),
-                            'prompt_used': result.get('prompt_used', ''),
-                            'model_type': content_item.get('model_type', model_type),
-                            'response_time': content_item.get('response_time', 0.0)
-                        }
-                        
-                        ContentStorageService.save_generated_content(
-                            user=request.user,
-                            content_data=content_data
-                        )
-                    
-                    logger.info(f"Auto-saved {len(result['content'])} generated content(s) for user {request.user.id}")
-                    
-                except Exception as save_error:
-                    logger.error(f"Failed to auto-save generated content: {save_error}")
-                    # Don't fail the request if save fails, just log it
-                
-                messages.success(request, 'Content generated and saved successfully!')
-                context = {
-                    'result': result,
-                    'product_info': product_info,
-                    'form_data': data
-                }
-                return render(request, 'generator/product_description_result.html', context)
-            else:
-                messages.error(request, f"Generation failed: {result['error']}")
-                return render(request, 'generator/product_description.html', {'form_data': data})
+        # Generate (and auto-save for form posts) in a background task
+        async_result, result = _dispatch_generation(
+            request, generate_product_description_task, payload,
+            auto_save=not is_json
+        )
+        if result is None:
+            return _pending_response(request, async_result)
+        
+        return _render_generator_result(
+            request, result, is_json, product_info, data,
+            result_template='generator/product_description_result.html',
+            form_template='generator/product_description.html',
+            success_message='Content generated and saved successfully!'
+        )
     
     except Exception as e:
         # Increment usage stats on failure
         usage_stats.increment_request_count(success=False)
         logger.error(f"Product description generation error: {e}")
-        if request.content_type == 'application/json':
-            return JsonResponse({
+        if is_json:
+            return OrjsonResponse({
                 'success': False,
                 'error': 'Internal server error',
                 'content': []
@@ -217,14 +252,12 @@ def social_media_generator(request):
     if request.method == 'GET':
         return render(request, 'generator/social_media.html')
 
-    usage_stats, _ = UserUsageStats.objects.get_or_create(user=request.user)
+    usage_stats = request.user_usage_stats
+    is_json = request.content_type == 'application/json'
 
     try:
         # Parse request data
-        if request.content_type == 'application/json':
-            data = json.loads(request.body)
-        else:
-            data = request.POST.dict()
+        data = orjson.loads(request.body) if is_json else request.POST.dict()
         
         # Extract product information
         product_info = {
@@ -234,76 +267,35 @@ def social_media_generator(request):
             'price': data.get('price', '')
         }
         
-        # Extract generation parameters
         platform = data.get('platform', 'instagram')
-        length = data.get('length', 'medium')
-        model_type = data.get('model_type', 'fast')
-        variations = int(data.get('variations', 1))
-        
-        # Generate content
-        service = ContentGenerationService()
-        result = service.generate_social_media_caption(
-            product_info=product_info,
-            platform=platform,
-            length=length,
-            model_type=model_type,
-            variations=variations
-        )
-        
-        usage_stats.increment_request_count(success=result['success'])
+        payload = {
+            'product_info': product_info,
+            'platform': platform,
+            'length': data.get('length', 'medium'),
+            'model_type': data.get('model_type', 'fast'),
+            'variations': int(data.get('variations', 1))
+        }
         
-        if request.content_type == 'application/json':
-            return JsonResponse(result)
-        else:
-            if result['success']:
-                # Auto-save generated content to database
-                try:
-                    for content_item in result['content']:
-                        content_data = {
-                            'content': content_item['text'],
-                            'content_type': 'social_media_caption',
-                            'product_name': product_info.get('name', 'Unknown Product'),
-                            'platform': platform,
-                            'category': product_info.get('category', 'general'),
-                            'request_data': {
-                                'product_info': product_info,
-                                'generation_parameters': result['parameters']
-                            },
-                            'parameters': result['parameters'],
-                            'estimated_cost': content_item.get('estimated_cost', 0.0),
-                            'tokens_used': content_item.get('generated_tokens', 0),
-                            'prompt_used': result.get('prompt_used', ''),
-                            'model_type': content_item.get('model_type', model_type),
-                            'response_time': content_item.get('response_time', 0.0)
-                        }
-                        
-                        ContentStorageService.save_generated_content(
-                            user=request.user,
-                            content_data=content_data
-                        )
-                    
-                    logger.info(f"Auto-saved {len(result['content'])} social media content(s) for user {request.user.id}")
-                    
-                except Exception as save_error:
-                    logger.error(f"Failed to auto-save social media content: {save_error}")
-                    # Don't fail the request if save fails, just log it
-                
-                messages.success(request, f'{platform.title()} caption generated and saved successfully!')
-                context = {
-                    'result': result,
-                    'product_info': product_info,
-                    'form_data': data
-                }
-                return render(request, 'generator/social_media_result.html', context)
-            else:
-                messages.error(request, f"Generation failed: {result['error']}")
-                return render(request, 'generator/social_media.html', {'form_data': data})
+        # Generate (and auto-save for form posts) in a background task
+        async_result, result = _dispatch_generation(
+            request, generate_social_media_task, payload,
+            auto_save=not is_json
+        )
+        if result is None:
+            return _pending_response(request, async_result)
+        
+        return _render_generator_result(
+            request, result, is_json, product_info, data,
+            result_template='generator/social_media_result.html',
+            form_template='generator/social_media.html',
+            success_message=f'{platform.title()} caption generated and saved successfully!'
+        )
     
     except Exception as e:
         usage_stats.increment_request_count(success=False)
         logger.error(f"Social media generation error: {e}")
-        if request.content_type == 'application/json':
-            return JsonResponse({
+        if is_json:
+            return OrjsonResponse({
                 'success': False,
                 'error': 'Internal server error',
                 'content': []
@@ -321,17 +313,19 @@ def headline_generator(request):
     if request.method == 'GET':
         return render(request, 'generator/headlines.html')
 
-    usage_stats, _ = UserUsageStats.objects.get_or_create(user=request.user)
+    usage_stats = request.user_usage_stats
+    is_json = request.content_type == 'application/json'
     
     try:
         # Parse request data
-        if request.content_type == 'application/json':
-            data = json.loads(request.body)
+        if is_json:
+            data = orjson.loads(request.body)
         else:
-            data = request.POST.dict()
-            # Handle multiple checkbox values for headline_types
-            if 'headline_types' in request.POST:
-                data['headline_types'] = request.POST.getlist('headline_types')
+            # Single pass over the form; headline_types keeps all checkbox values
+            data = {
+                key: request.POST.getlist(key) if key == 'headline_types' else request.POST.get(key)
+                for key in request.POST
+            }
         
         # Extract product information
         product_info = {
@@ -357,148 +351,38 @@ def headline_generator(request):
         tone = data.get('tone', 'profesional')
         tone = _map_tone_to_english(tone)  # Convert Indonesian tone to English
         
-        variations = int(data.get('variations', 5))
-        model_type = data.get('model_type', 'quality')
-        additional_instructions = data.get('additional_instructions', '')
-        
-        # Generate content for each headline type
-        service = ContentGenerationService()
-        all_results = []
-        total_variations = int(data.get('variations', 5))
-        
-        # Calculate variations per headline type
-        num_types = len(headline_types)
-        variations_per_type = max(1, total_variations // num_types)
-        remaining_variations = total_variations % num_types
-        
-        total_cost = 0.0
-        total_time = 0.0
-        any_success = False
-        
-        for i, headline_type in enumerate(headline_types):
-            # Distribute remaining variations to first few types
-            current_variations = variations_per_type
-            if i < remaining_variations:
-                current_variations += 1
-            
-            result = service.generate_marketing_headline(
-                product_info=product_info,
-                headline_type=headline_type,
-                usage_context=usage_context,
-                character_limit=character_limit,
-                tone=tone,
-                model_type=model_type,
-                variations=current_variations,
-                additional_instructions=additional_instructions
-            )
-            
-            if result['success']:
-                any_success = True
-                # Add headline type to each content item
-                for content_item in result['content']:
-                    content_item['headline_type'] = headline_type
-                    content_item['text'] = content_item.get('headline_text', content_item.get('text', ''))
-                
-                all_results.extend(result['content'])
-                total_cost += sum(float(item.get('estimated_cost', 0)) for item in result['content'])
-                total_time += sum(float(item.get('response_time', 0)) for item in result['content'])
-        
-        usage_stats.increment_request_count(success=any_success)
-
-        if all_results:
-            # Combine all results
-            final_result = {
-                'success': True,
-                'content': all_results,
-                'parameters': {
-                    'headline_types': headline_types,
-                    'usage_context': usage_context,
-                    'character_limit': character_limit,
-                    'tone': tone,
-                    'variations': total_variations,
-                    'model_type': model_type
-                },
-                'total_cost': total_cost,
-                'total_time': total_time
-            }
-            
-            if request.content_type == 'application/json':
-                return JsonResponse(final_result)
-            else:
-                # Save as a single database record with all headlines combined
-                try:
-                    # Combine all headlines into a single content string
-                    combined_headlines = []
-                    for i, content_item in enumerate(all_results, 1):
-                        headline_type = content_item.get('headline_type', 'general')
-                        headline_text = content_item.get('text', '')
-                        combined_headlines.append(f"{i}. [{headline_type.replace('_', ' ').title()}] {headline_text}")
-                    
-                    combined_content = '\n\n'.join(combined_headlines)
-                    
-                    content_data = {
-                        'content': combined_content,
-                        'content_type': 'marketing_headline',
-                        'product_name': product_info.get('name', 'Unknown Product'),
-                        'platform': usage_context,
-                        'category': product_info.get('category', 'general'),
-                        'request_data': {
-                            'product_info': product_info,
-                            'generation_parameters': final_result['parameters'],
-                            'headline_types': headline_types,
-                            'individual_headlines': [
-                                {
-                                    'text': item.get('text', ''),
-                                    'type': item.get('headline_type', 'general'),
-                                    'cost': item.get('estimated_cost', 0.0),
-                                    'tokens': item.get('generated_tokens', 0)
-                                } for item in all_results
-                            ]
-                        },
-                        'parameters': final_result['parameters'],
-                        'estimated_cost': total_cost,
-                        'tokens_used': sum(item.get('generated_tokens', 0) for item in all_results),
-                        'prompt_used': f"Generated {len(all_results)} headlines for types: {', '.join(headline_types)}",
-                        'model_type': model_type,
-                        'response_time': total_time
-                    }
-                    
-                    ContentStorageService.save_generated_content(
-                        user=request.user,
-                        content_data=content_data
-                    )
-                    
-                    logger.info(f"Saved 1 record with {len(all_results)} headlines for user {request.user.id}")
-                    
-                except Exception as save_error:
-                    logger.error(f"Failed to save headline content: {save_error}")
-                    # Don't fail the request if save fails, just log it
-                
-                messages.success(request, f'{len(all_results)} headlines generated and saved successfully!')
-                context = {
-                    'result': final_result,
-                    'product_info': product_info,
-                    'form_data': data
-                }
-                return render(request, 'generator/headlines_result.html', context)
-        else:
-            error_result = {
-                'success': False,
-                'error': 'Failed to generate any headlines',
-                'content': []
-            }
-            
-            if request.content_type == 'application/json':
-                return JsonResponse(error_result)
-            else:
-                messages.error(request, "Generation failed: Could not generate headlines")
-                return render(request, 'generator/headlines.html', {'form_data': data})
+        payload = {
+            'product_info': product_info,
+            'headline_types': headline_types,
+            'usage_context': usage_context,
+            'character_limit': character_limit,
+            'tone': tone,
+            'model_type': data.get('model_type', 'quality'),
+            'variations': int(data.get('variations', 5)),
+            'additional_instructions': data.get('additional_instructions', '')
+        }
+        
+        # Generate every headline type (and auto-save for form posts) in a background task
+        async_result, result = _dispatch_generation(
+            request, generate_headline_task, payload,
+            auto_save=not is_json
+        )
+        if result is None:
+            return _pending_response(request, async_result)
+        
+        return _render_generator_result(
+            request, result, is_json, product_info, data,
+            result_template='generator/headlines_result.html',
+            form_template='generator/headlines.html',
+            success_message=f"{len(result['content'])} headlines generated and saved successfully!",
+            failure_message="Generation failed: Could not generate headlines"
+        )
     
     except Exception as e:
         usage_stats.increment_request_count(success=False)
         logger.error(f"Headlines generation error: {e}")
-        if request.content_type == 'application/json':
-            return JsonResponse({
+        if is_json:
+            return OrjsonResponse({
                 'success': False,
                 'error': 'Internal server error',
                 'content': []
@@ -514,12 +398,12 @@ def headline_generator(request):
 def test_connection(request):
     """Test AWS Bedrock connection"""
     try:
-        service = ContentGenerationService()
+        service = ContentGenerationService.shared()
         result = service.test_connection()
-        return JsonResponse(result)
+        return OrjsonResponse(result)
     except Exception as e:
         logger.error(f"Connection test error: {e}")
-        return JsonResponse({
+        return OrjsonResponse({
             'status': 'error',
             'message': f'Connection test failed: {e}'
         })
@@ -531,32 +415,34 @@ def test_connection(request):
 def analyze_content(request):
     """Analyze content quality and provide insights"""
     try:
-        data = json.loads(request.body)
+        data = orjson.loads(request.body)
         content = data.get('content', '')
         content_type = data.get('content_type', 'general')
         
         if not content:
-            return JsonResponse({
+            return OrjsonResponse({
                 'success': False,
                 'error': 'Content is required'
             })
         
         analysis = ContentAnalyzer.analyze_content_quality(content, content_type)
         
-        return JsonResponse({
+        return OrjsonResponse({
             'success': True,
             'analysis': analysis
         })
         
     except Exception as e:
         logger.error(f"Content analysis error: {e}")
-        return JsonResponse({
+        return OrjsonResponse({
             'success': False,
             'error': 'Analysis failed'
         })
 
 
 @login_required
+@vary_on_cookie
+@condition(etag_func=_content_state_etag)
 def content_history(request):
     """View content generation history"""
     try:
@@ -586,8 +472,7 @@ def content_history(request):
         page_obj = paginator.get_page(page_number)
         
         # Get available content types and platforms for filters
-        from apps.generator.models import ContentType
-        content_types = ContentType.objects.filter(is_active=True).values('name', 'platform').distinct()
+        content_types = get_active_content_types()
         
         context = {
             'page_obj': page_obj,
@@ -610,6 +495,8 @@ def content_history(request):
 
 
 @login_required
+@vary_on_cookie
+@condition(etag_func=_content_state_etag)
 def usage_stats(request):
     """View usage statistics"""
     try:
@@ -628,6 +515,37 @@ def usage_stats(request):
         return render(request, 'generator/usage_stats.html', {'stats': {}})
 
 
+# Streaming variants of API_GENERATORS; each variation is a separate Bedrock call
+STREAMING_GENERATORS = {
+    'product_description': lambda service, data: service.stream_product_description(
+        product_info=data.get('product_info', {}),
+        length=data.get('length', 'medium'),
+        tone=data.get('tone', 'professional'),
+        model_type=data.get('model_type', 'fast'),
+        variations=data.get('variations', 1)
+    ),
+    'social_media_caption': lambda service, data: service.stream_social_media_caption(
+        product_info=data.get('product_info', {}),
+        platform=data.get('platform', 'instagram'),
+        length=data.get('length', 'medium'),
+        model_type=data.get('model_type', 'fast'),
+        variations=data.get('variations', 1)
+    ),
+}
+
+
+def _stream_api_content(content_type, data):
+    """Yield generated items, ending with an error line if generation fails midway"""
+    try:
+        yield from STREAMING_GENERATORS[content_type](ContentGenerationService.shared(), data)
+    except Exception as e:
+        logger.error(f"API content streaming error: {e}")
+        yield {
+            'success': False,
+            'error': 'Internal server error'
+        }
+
+
 # API Views for AJAX requests
 @login_required
 @csrf_exempt
@@ -635,68 +553,70 @@ def usage_stats(request):
 def api_generate_content(request):
     """Generic API endpoint for content generation"""
     try:
-        data = json.loads(request.body)
+        data = orjson.loads(request.body)
         content_type = data.get('content_type')
         
-        service = ContentGenerationService()
-        
-        if content_type == 'product_description':
-            result = service.generate_product_description(
-                product_info=data.get('product_info', {}),
-                length=data.get('length', 'medium'),
-                tone=data.get('tone', 'professional'),
-                model_type=data.get('model_type', 'fast'),
-                variations=data.get('variations', 1)
-            )
-        elif content_type == 'social_media_caption':
-            result = service.generate_social_media_caption(
-                product_info=data.get('product_info', {}),
-                platform=data.get('platform', 'instagram'),
-                length=data.get('length', 'medium'),
-                model_type=data.get('model_type', 'fast'),
-                variations=data.get('variations', 1)
-            )
-        elif content_type == 'marketing_headline':
-            result = service.generate_marketing_headline(
-                product_info=data.get('product_info', {}),
-                headline_type=data.get('headline_type', 'attention_grabbing'),
-                usage_context=data.get('usage_context', 'website'),
-                character_limit=data.get('character_limit'),
-                tone=_map_tone_to_english(data.get('tone', 'profesional')),
-                model_type=data.get('model_type', 'quality'),
-                variations=data.get('variations', 5),
-                additional_instructions=data.get('additional_instructions', '')
-            )
-        elif content_type == 'email_content':
-            result = service.generate_email_content(
-                product_info=data.get('product_info', {}),
-                email_type=data.get('email_type', 'promotional'),
-                tone=data.get('tone', 'friendly'),
-                model_type=data.get('model_type', 'fast')
-            )
-        elif content_type == 'website_copy':
-            result = service.generate_website_copy(
-                product_info=data.get('product_info', {}),
-                section=data.get('section', 'hero'),
-                tone=data.get('tone', 'professional'),
-                model_type=data.get('model_type', 'fast')
-            )
-        else:
-            return JsonResponse({
+        if content_type not in API_GENERATORS:
+            return OrjsonResponse({
                 'success': False,
                 'error': f'Unsupported content type: {content_type}'
             })
         
-        return JsonResponse(result)
+        if content_type == 'marketing_headline':
+            data['tone'] = _map_tone_to_english(data.get('tone', 'profesional'))
+        
+        if data.get('stream') and content_type in STREAMING_GENERATORS:
+            # One NDJSON line per variation as soon as Bedrock returns it
+            return StreamingHttpResponse(
+                ndjson_lines(_stream_api_content(content_type, data)),
+                content_type='application/x-ndjson'
+            )
+        
+        async_result, result = _dispatch_generation(request, generate_api_content_task, content_type, data)
+        if result is None:
+            return _pending_response(request, async_result)
+        
+        return OrjsonResponse(result)
         
     except Exception as e:
         logger.error(f"API content generation error: {e}")
-        return JsonResponse({
+        return OrjsonResponse({
             'success': False,
             'error': 'Internal server error'
         })
 
 
+@login_required
+@require_http_methods(["GET"])
+def task_status(request, task_id):
+    """Poll a background generation task started by this user"""
+    async_result = AsyncResult(task_id)
+    
+    if not async_result.ready():
+        return OrjsonResponse({'status': 'pending', 'task_id': task_id})
+    
+    if async_result.failed():
+        return OrjsonResponse({
+            'status': 'done',
+            'task_id': task_id,
+            'result': {
+                'success': False,
+                'error': 'Internal server error',
+                'content': []
+            }
+        })
+    
+    task_result = async_result.result
+    if task_result.get('user_id') != request.user.pk:
+        return OrjsonResponse({'error': 'Task not found'}, status=404)
+    
+    return OrjsonResponse({
+        'status': 'done',
+        'task_id': task_id,
+        'result': task_result['result']
+    })
+
+
 @login_required
 def quick_generator(request):
     """Quick generator for simple content creation"""
@@ -709,7 +629,7 @@ def quick_generator(request):
 def api_save_content(request):
     """API endpoint to save generated content"""
     try:
-        data = json.loads(request.body)
+        data = orjson.loads(request.body)
         content = data.get('content', '')
         content_type = data.get('content_type', 'general')
         product_name = data.get('product_name', '')
@@ -717,7 +637,7 @@ def api_save_content(request):
         headline_type = data.get('headline_type', '')
         
         if not content:
-            return JsonResponse({
+            return OrjsonResponse({
                 'success': False,
                 'error': 'Content is required'
             })
@@ -749,7 +669,7 @@ def api_save_content(request):
         
         logger.info(f"Saved content for user {request.user.id}: {content_type}")
         
-        return JsonResponse({
+        return OrjsonResponse({
             'success': True,
             'message': 'Content saved successfully',
             'content_id': saved_content.id,
@@ -758,7 +678,7 @@ def api_save_content(request):
         
     except Exception as e:
         logger.error(f"Content save error: {e}")
-        return JsonResponse({
+        return OrjsonResponse({
             'success': False,
             'error': 'Failed to save content'
         })
@@ -770,61 +690,28 @@ def api_save_content(request):
 def generate_ab_test(request):
     """Generate A/B test variations for headlines"""
     try:
-        data = json.loads(request.body)
+        data = orjson.loads(request.body)
         base_headline = data.get('base_headline', '')
         test_types = data.get('test_types', ['short_vs_long'])
         
         if not base_headline:
-            return JsonResponse({
+            return OrjsonResponse({
                 'success': False,
                 'error': 'Base headline is required'
             })
         
-        # Generate variations based on test types
-        variations = []
-        
-        for test_type in test_types:
-            if test_type == 'short_vs_long':
-                variations.extend([
-                    {
-                        'type': 'short_version',
-                        'headline': _create_short_version(base_headline),
-                        'description': 'Shorter, more concise version'
-                    },
-                    {
-                        'type': 'long_version', 
-                        'headline': _create_long_version(base_headline),
-                        'description': 'Longer, more descriptive version'
-                    }
-                ])
-            elif test_type == 'emotional_vs_logical':
-                variations.extend([
-                    {
-                        'type': 'emotional',
-                        'headline': _create_emotional_version(base_headline),
-                        'description': 'Appeals to emotions and feelings'
-                    },
-                    {
-                        'type': 'logical',
-                        'headline': _create_logical_version(base_headline),
-                        'description': 'Appeals to logic and facts'
-                    }
-                ])
-            elif test_type == 'with_numbers_vs_without':
-                variations.extend([
-                    {
-                        'type': 'with_numbers',
-                        'headline': _add_numbers_to_headline(base_headline),
-                        'description': 'Includes specific numbers or statistics'
-                    },
-                    {
-                        'type': 'without_numbers',
-                        'headline': _remove_numbers_from_headline(base_headline),
-                        'description': 'Focuses on qualitative benefits'
-                    }
-                ])
-        
-        return JsonResponse({
+        # Generate variations based on test types; unknown types are ignored
+        variations = [
+            {
+                'type': variation_type,
+                'headline': create_variation(base_headline),
+                'description': description
+            }
+            for test_type in test_types
+            for variation_type, create_variation, description in AB_TEST_VARIANTS.get(test_type, ())
+        ]
+        
+        return OrjsonResponse({
             'success': True,
             'variations': variations,
             'base_headline': base_headline
@@ -832,13 +719,47 @@ def generate_ab_test(request):
         
     except Exception as e:
         logger.error(f"A/B test generation error: {e}")
-        return JsonResponse({
+        return OrjsonResponse({
             'success': False,
             'error': 'Failed to generate A/B test variations'
         })
 
 
 # Helper functions for A/B test generation
+NUMBER_RE = re.compile(r'\d+')
+NUMBER_WORD_RE = re.compile(r'(rp|rupiah|\%|persen)', re.IGNORECASE)
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Descriptive words based on common patterns
+LONG_VERSION_DESCRIPTORS = ("Eksklusif", "Terbatas", "Premium", "Handmade", "Berkualitas Tinggi")
+LOGICAL_ADDITIONS = (
+    "Terbukti efektif",
+    "Hemat waktu 50%", 
+    "Garansi 100%",
+    "Bahan berkualitas premium",
+    "Dipercaya ribuan customer"
+)
+NUMBER_ADDITIONS = (
+    "dalam 7 hari",
+    "hingga 50%",
+    "mulai Rp 99.000",
+    "lebih dari 1000+ customer",
+    "tersedia 24/7"
+)
+QUALITATIVE_WORDS = ("Terbaik", "Berkualitas", "Istimewa", "Luar Biasa")
+
+EMOTIONAL_WORDS = {
+    'produk': 'karya impian',
+    'barang': 'harta karun',
+    'item': 'keajaiban',
+    'beli': 'miliki',
+    'dapat': 'rasakan',
+    'murah': 'terjangkau untuk semua'
+}
+# All swaps in one pass; whole words only, so "membeli" keeps its "beli"
+EMOTIONAL_WORD_RE = re.compile(r'\b(?:' + '|'.join(map(re.escape, EMOTIONAL_WORDS)) + r')\b')
+
+
 def _create_short_version(headline):
     """Create a shorter version of the headline"""
     words = headline.split()
@@ -855,88 +776,74 @@ def _create_long_version(headline):
     if len(headline) > 50:
         return headline
     
-    # Add descriptive words based on common patterns
-    descriptors = ["Eksklusif", "Terbatas", "Premium", "Handmade", "Berkualitas Tinggi"]
-    
     # Simple approach: add a descriptor at the beginning
-    import random
-    descriptor = random.choice(descriptors)
+    descriptor = random.choice(LONG_VERSION_DESCRIPTORS)
     return f"{descriptor} {headline}"
 
 
 def _create_emotional_version(headline):
     """Create an emotional appeal version"""
-    emotional_words = {
-        'produk': 'karya impian',
-        'barang': 'harta karun',
-        'item': 'keajaiban',
-        'beli': 'miliki',
-        'dapat': 'rasakan',
-        'murah': 'terjangkau untuk semua'
-    }
-    
-    result = headline
-    for word, emotional_word in emotional_words.items():
-        result = result.replace(word, emotional_word)
-    
-    return result
+    return EMOTIONAL_WORD_RE.sub(lambda match: EMOTIONAL_WORDS[match.group(0)], headline)
 
 
 def _create_logical_version(headline):
     """Create a logical appeal version"""
-    logical_additions = [
-        "Terbukti efektif",
-        "Hemat waktu 50%", 
-        "Garansi 100%",
-        "Bahan berkualitas premium",
-        "Dipercaya ribuan customer"
-    ]
-    
-    import random
-    addition = random.choice(logical_additions)
+    addition = random.choice(LOGICAL_ADDITIONS)
     return f"{headline} - {addition}"
 
 
 def _add_numbers_to_headline(headline):
     """Add specific numbers to headline"""
-    number_additions = [
-        "dalam 7 hari",
-        "hingga 50%",
-        "mulai Rp 99.000",
-        "lebih dari 1000+ customer",
-        "tersedia 24/7"
-    ]
-    
-    import random
-    addition = random.choice(number_additions)
+    addition = random.choice(NUMBER_ADDITIONS)
     return f"{headline} {addition}"
 
 
 def _remove_numbers_from_headline(headline):
     """Remove numbers and focus on qualitative benefits"""
-    import re
     # Remove numbers and related words
-    result = re.sub(r'\d+', '', headline)
-    result = re.sub(r'(rp|rupiah|\%|persen)', '', result, flags=re.IGNORECASE)
+    result = NUMBER_RE.sub('', headline)
+    result = NUMBER_WORD_RE.sub('', result)
     
     # Clean up extra spaces
-    result = re.sub(r'\s+', ' ', result).strip()
+    result = WHITESPACE_RE.sub(' ', result).strip()
     
     # Add qualitative words instead
-    qualitative_words = ["Terbaik", "Berkualitas", "Istimewa", "Luar Biasa"]
-    import random
-    qualifier = random.choice(qualitative_words)
+    qualifier = random.choice(QUALITATIVE_WORDS)
     
     return f"{qualifier} {result}"
 
 
+# A/B test type -> (variation type, builder, description) for each side of the test
+AB_TEST_VARIANTS = {
+    'short_vs_long': (
+        ('short_version', _create_short_version, 'Shorter, more concise version'),
+        ('long_version', _create_long_version, 'Longer, more descriptive version'),
+    ),
+    'emotional_vs_logical': (
+        ('emotional', _create_emotional_version, 'Appeals to emotions and feelings'),
+        ('logical', _create_logical_version, 'Appeals to logic and facts'),
+    ),
+    'with_numbers_vs_without': (
+        ('with_numbers', _add_numbers_to_headline, 'Includes specific numbers or statistics'),
+        ('without_numbers', _remove_numbers_from_headline, 'Focuses on qualitative benefits'),
+    ),
+}
+
+
 # ====== EXPORT VIEWS ======
 
+# Upper bound on ids per bulk export; keeps the IN (...) list well under
+# PostgreSQL's bind-parameter limit
+MAX_BULK_EXPORT_IDS = 1000
+
+
 @login_required
-def export_single_content(request: HttpRequest, content_id: int, format_type: str = 'txt') -> Union[HttpResponse, JsonResponse]:
+def export_single_content(request: HttpRequest, content_id: int, format_type: str = 'txt') -> Union[HttpResponse, OrjsonResponse]:
     """Export a single content item"""
     try:
-        content = GeneratedContent.objects.get(id=content_id, user=request.user)
+        content = GeneratedContent.objects.select_related(
+            'request__category', 'request__content_type'
+        ).get(id=content_id, user=request.user, is_deleted=False)
         exporter = ContentExporter()
         
         # Ensure format is supported for MVP
@@ -945,75 +852,99 @@ def export_single_content(request: HttpRequest, content_id: int, format_type: st
             
         return exporter.export_single(content, format_type)
     except GeneratedContent.DoesNotExist:
-        return JsonResponse({'error': 'Content not found'}, status=404)
+        return OrjsonResponse({'error': 'Content not found'}, status=404)
     except Exception as e:
         logger.error(f"Export error: {e}")
-        return JsonResponse({'error': 'Export failed'}, status=500)
+        return OrjsonResponse({'error': 'Export failed'}, status=500)
 
 
 @login_required
-def export_bulk_content(request: HttpRequest) -> Union[HttpResponse, JsonResponse]:
+def export_bulk_content(request: HttpRequest) -> Union[HttpResponse, OrjsonResponse]:
     """Export multiple content items"""
     try:
         # Get parameters
-        content_ids = request.GET.get('ids', '').split(',')
         format_type = request.GET.get('format', 'csv')
         
-        if not content_ids or content_ids == ['']:
-            return JsonResponse({'error': 'No content IDs provided'}, status=400)
+        # Parse and dedupe up front so malformed ids are rejected before querying
+        try:
+            content_ids = {
+                uuid.UUID(content_id.strip())
+                for content_id in request.GET.get('ids', '').split(',')
+                if content_id.strip()
+            }
+        except ValueError:
+            return OrjsonResponse({'error': 'Invalid content IDs'}, status=400)
+        
+        if not content_ids:
+            return OrjsonResponse({'error': 'No content IDs provided'}, status=400)
+        
+        if len(content_ids) > MAX_BULK_EXPORT_IDS:
+            return OrjsonResponse({
+                'error': f'Too many content IDs (maximum {MAX_BULK_EXPORT_IDS})'
+            }, status=400)
         
         # Get content items
         content_items = GeneratedContent.objects.filter(
             id__in=content_ids,
-            user=request.user
-        ).select_related('request__category', 'request__content_type')
+            user=request.user,
+            is_deleted=False
+        )
         
-        if not content_items:
-            return JsonResponse({'error': 'No content found'}, status=404)
+        # The count doubles as the existence check and feeds the json/txt headers
+        total = content_items.count()
+        if not total:
+            return OrjsonResponse({'error': 'No content found'}, status=404)
         
         exporter = ContentExporter()
-        return exporter.export_bulk(content_items, format_type)
+        return exporter.stream_bulk(
+            ContentStorageService.iter_user_content(request.user, content_ids=content_ids),
+            format_type,
+            total
+        )
     
     except Exception as e:
         logger.error(f"Bulk export error: {e}")
-        return JsonResponse({'error': 'Export failed'}, status=500)
+        return OrjsonResponse({'error': 'Export failed'}, status=500)
 
 
 @login_required
 @require_http_methods(["POST"])
 def toggle_favorite_content(request, content_id):
     """Toggle favorite status of content"""
-    try:
-        content = GeneratedContent.objects.get(id=content_id, user=request.user)
-        content.is_favorite = not content.is_favorite
-        content.save()
-        
-        return JsonResponse({
-            'success': True,
-            'is_favorite': content.is_favorite
-        })
-    except GeneratedContent.DoesNotExist:
-        return JsonResponse({'error': 'Content not found'}, status=404)
+    # Read just the flag, then write it back with a single-column UPDATE
+    is_favorite = GeneratedContent.objects.filter(
+        id=content_id, user=request.user, is_deleted=False
+    ).values_list('is_favorite', flat=True).first()
+    
+    if is_favorite is None or not ContentStorageService.mark_as_favorite(
+        request.user, content_id, not is_favorite
+    ):
+        return OrjsonResponse({'error': 'Content not found'}, status=404)
+    
+    return OrjsonResponse({
+        'success': True,
+        'is_favorite': not is_favorite
+    })
 
 
 @login_required
 @require_http_methods(["DELETE"])
 def delete_content(request, content_id):
     """Delete a content item"""
-    try:
-        content = GeneratedContent.objects.get(id=content_id, user=request.user)
-        content.delete()
-        
-        return JsonResponse({'success': True})
-    except GeneratedContent.DoesNotExist:
-        return JsonResponse({'error': 'Content not found'}, status=404)
+    if ContentStorageService.delete_content(request.user, content_id):
+        return OrjsonResponse({'success': True})
+    return OrjsonResponse({'error': 'Content not found'}, status=404)
 
 
 @login_required
+@vary_on_cookie
+@condition(last_modified_func=_content_last_modified)
 def content_detail(request, content_id):
     """Display detailed view of content for easy copy-paste"""
     try:
-        content = GeneratedContent.objects.get(id=content_id, user=request.user)
+        content = GeneratedContent.objects.select_related(
+            'request__category', 'request__content_type'
+        ).get(id=content_id, user=request.user, is_deleted=False)
         return render(request, 'generator/content_detail.html', {'content': content})
     except GeneratedContent.DoesNotExist:
         messages.error(request, 'Content not found')
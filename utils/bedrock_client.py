@@ -1,107 +1,218 @@
 import boto3
-import json
+import hashlib
 import time
 import logging
+import random
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from django.conf import settings
 from django.core.cache import cache
+from django.db import connection
+import orjson
+from botocore.config import Config
 from botocore.exceptions import ClientError, BotoCoreError
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on concurrent Bedrock calls for one multi-variation request
+MAX_CONCURRENT_VARIATIONS = 8
+
+# Cached generations are fresh for CACHE_TIMEOUT seconds, then served stale
+# (while a background task regenerates them) until CACHE_STALE_TIMEOUT
+CACHE_TIMEOUT = 3600
+CACHE_STALE_TIMEOUT = 2 * CACHE_TIMEOUT
+
+# How long a queued refresh blocks further refreshes of the same entry
+CACHE_REFRESH_LOCK_TIMEOUT = 60
+
+# Longest wait between retries of a throttled call, in seconds
+MAX_RETRY_WAIT = 8.0
+
+# Entries kept in the per-process cache in front of Django's cache
+LOCAL_CACHE_MAX_ENTRIES = 1024
+
+# generate_content retries itself, so botocore's own retries are switched off;
+# the pool covers the variation fan-out across a few concurrent requests
+BOTO_CONFIG = Config(
+    max_pool_connections=50,
+    retries={'max_attempts': 0},
+    tcp_keepalive=True
+)
+
+def _approx_token_count(text: str) -> int:
+    """Approximate token count as whitespace-separated words, without building a word list"""
+    if not text:
+        return 0
+    return text.count(' ') + text.count('\n') + 1
+
+def _retry_wait(error: ClientError, attempt: int) -> float:
+    """Seconds to wait before retrying: AWS's Retry-After if sent, else capped backoff with jitter"""
+    retry_after = error.response.get('ResponseMetadata', {}).get('HTTPHeaders', {}).get('retry-after')
+    if retry_after:
+        try:
+            return min(MAX_RETRY_WAIT, max(0.0, float(retry_after)))
+        except ValueError:
+            # HTTP-date form; fall back to backoff
+            pass
+    return min(MAX_RETRY_WAIT, 2 ** attempt) + random.uniform(0, 0.5)
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+def _get_shared_client():
+    """Create the bedrock-runtime client once per process so its connection pool is reused"""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = boto3.client(
+                    'bedrock-runtime',
+                    region_name=settings.AWS_REGION,
+                    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                    config=BOTO_CONFIG
+                )
+    return _shared_client
+
+class _LocalTTLCache:
+    """Thread-safe in-process LRU with a fixed time-to-live per entry"""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+        # Callers annotate results in place, so never hand out the stored dict
+        return dict(value)
+    
+    def set(self, key: str, value: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, dict(value))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
 class BedrockClientError(Exception):
     """Custom exception for Bedrock client errors"""
     pass
 
 class BedrockClient:
+    # Shared by every client in the process; checked before the cache backend
+    _local_cache = _LocalTTLCache(maxsize=LOCAL_CACHE_MAX_ENTRIES, ttl=CACHE_TIMEOUT)
+    
     def __init__(self):
         try:
-            self.client = boto3.client(
-                'bedrock-runtime',
-                region_name=settings.AWS_REGION,
-                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
-            )
+            self.client = _get_shared_client()
             self.models = settings.BEDROCK_MODELS
+            # Resolve each configured model's format once instead of per call
+            self._families = {
+                model_id: self._detect_family(model_id) for model_id in self.models.values()
+            }
+            self._body_builders = {
+                'nova': self._nova_body,
+                'titan': self._titan_body,
+                'claude': self._claude_body,
+            }
+            self._parsers = {
+                'nova': self._parse_nova,
+                'titan': self._parse_titan,
+                'claude': self._parse_claude,
+            }
         except Exception as e:
             logger.error(f"Failed to initialize Bedrock client: {e}")
             raise BedrockClientError(f"AWS Bedrock initialization failed: {e}")
     
-    def _get_model_body(self, prompt: str, model_id: str, max_tokens: int = 1000) -> Dict[str, Any]:
-        """Prepare request body based on model type"""
-        if 'nova' in model_id.lower():
-            return {
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "text": prompt
-                            }
-                        ]
-                    }
-                ],
-                "inferenceConfig": {
-                    "max_new_tokens": max_tokens,
-                    "temperature": 0.7,
-                    "top_p": 0.9
-                }
-            }
-        elif 'titan' in model_id.lower():
-            return {
-                "inputText": prompt,
-                "textGenerationConfig": {
-                    "maxTokenCount": max_tokens,
-                    "temperature": 0.7,
-                    "topP": 0.9,
-                    "stopSequences": []
+    @staticmethod
+    def _detect_family(model_id: str) -> str:
+        """Map a Bedrock model ID to its request/response format"""
+        model_id = model_id.lower()
+        for family in ('nova', 'titan', 'claude'):
+            if family in model_id:
+                return family
+        # Default to Nova (since those are our primary models now)
+        return 'nova'
+    
+    def _model_family(self, model_id: str) -> str:
+        family = self._families.get(model_id)
+        if family is None:
+            family = self._families[model_id] = self._detect_family(model_id)
+        return family
+    
+    def _nova_body(self, prompt: str, max_tokens: int) -> Dict[str, Any]:
+        return {
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "text": prompt
+                        }
+                    ]
                 }
-            }
-        elif 'claude' in model_id.lower():
-            return {
-                "anthropic_version": "bedrock-2023-05-04",
-                "max_tokens": max_tokens,
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+            ],
+            "inferenceConfig": {
+                "max_new_tokens": max_tokens,
                 "temperature": 0.7,
                 "top_p": 0.9
             }
-        else:
-            # Default format for Nova models (since those are our primary models now)
-            return {
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "text": prompt
-                            }
-                        ]
-                    }
-                ],
-                "inferenceConfig": {
-                    "max_new_tokens": max_tokens,
-                    "temperature": 0.7,
-                    "top_p": 0.9
-                }
+        }
+    
+    def _titan_body(self, prompt: str, max_tokens: int) -> Dict[str, Any]:
+        return {
+            "inputText": prompt,
+            "textGenerationConfig": {
+                "maxTokenCount": max_tokens,
+                "temperature": 0.7,
+                "topP": 0.9,
+                "stopSequences": []
             }
+        }
+    
+    def _claude_body(self, prompt: str, max_tokens: int) -> Dict[str, Any]:
+        return {
+            "anthropic_version": "bedrock-2023-05-04",
+            "max_tokens": max_tokens,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "temperature": 0.7,
+            "top_p": 0.9
+        }
+    
+    def _parse_nova(self, response_body: Dict[str, Any]) -> str:
+        return response_body.get('output', {}).get('message', {}).get('content', [{}])[0].get('text', '')
+    
+    def _parse_titan(self, response_body: Dict[str, Any]) -> str:
+        return response_body.get('results', [{}])[0].get('outputText', '')
+    
+    def _parse_claude(self, response_body: Dict[str, Any]) -> str:
+        return response_body.get('content', [{}])[0].get('text', '')
+    
+    def _get_model_body(self, prompt: str, model_id: str, max_tokens: int = 1000) -> Dict[str, Any]:
+        """Prepare request body based on model type"""
+        return self._body_builders[self._model_family(model_id)](prompt, max_tokens)
     
     def _parse_response(self, response_body: Dict[str, Any], model_id: str) -> str:
         """Parse response based on model type"""
         try:
-            if 'nova' in model_id.lower():
-                return response_body.get('output', {}).get('message', {}).get('content', [{}])[0].get('text', '')
-            elif 'titan' in model_id.lower():
-                return response_body.get('results', [{}])[0].get('outputText', '')
-            elif 'claude' in model_id.lower():
-                return response_body.get('content', [{}])[0].get('text', '')
-            else:
-                # Default for Nova models (since those are our primary models now)
-                return response_body.get('output', {}).get('message', {}).get('content', [{}])[0].get('text', '')
+            return self._parsers[self._model_family(model_id)](response_body)
         except (KeyError, IndexError, TypeError) as e:
             logger.error(f"Failed to parse response for model {model_id}: {e}")
             logger.debug(f"Response body: {response_body}")
@@ -109,9 +220,58 @@ class BedrockClient:
     
     def _generate_cache_key(self, prompt: str, model_id: str, max_tokens: int) -> str:
         """Generate cache key for request"""
-        import hashlib
-        content = f"{prompt}{model_id}{max_tokens}"
-        return f"bedrock_cache_{hashlib.md5(content.encode()).hexdigest()}"
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(prompt.encode())
+        digest.update(model_id.encode())
+        digest.update(str(max_tokens).encode())
+        return f"bedrock_cache_v2_{digest.hexdigest()}"
+    
+    def _get_cached(self, cache_key: str, prompt: str, model_type: str,
+                    max_tokens: int) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached result for a key, or None on a miss. Entries past their
+        soft expiry are still returned once a background refresh has been queued.
+        """
+        entry = self._local_cache.get(cache_key)
+        if entry is None or entry['soft_expires_at'] <= time.time():
+            # Another worker may already have refreshed the shared entry
+            entry = cache.get(cache_key)
+            if entry is None:
+                return None
+            self._local_cache.set(cache_key, entry)
+        
+        if entry['soft_expires_at'] <= time.time():
+            if not self._schedule_refresh(cache_key, prompt, model_type, max_tokens):
+                return None
+            logger.info(f"Serving stale cache entry for model type {model_type}")
+        
+        return dict(entry['result'])
+    
+    def _set_cached(self, cache_key: str, result: Dict[str, Any]) -> None:
+        entry = {'result': dict(result), 'soft_expires_at': time.time() + CACHE_TIMEOUT}
+        cache.set(cache_key, entry, timeout=CACHE_STALE_TIMEOUT)
+        self._local_cache.set(cache_key, entry)
+    
+    def _schedule_refresh(self, cache_key: str, prompt: str, model_type: str,
+                          max_tokens: int) -> bool:
+        """Queue regeneration of a stale entry; False means the caller should regenerate inline"""
+        if getattr(settings, 'CELERY_TASK_ALWAYS_EAGER', True):
+            # Without a broker the "background" task would run inline anyway
+            return False
+        
+        lock_key = f"{cache_key}_refreshing"
+        if not cache.add(lock_key, True, timeout=CACHE_REFRESH_LOCK_TIMEOUT):
+            # Someone else is already refreshing this entry
+            return True
+        
+        try:
+            from apps.generator.tasks import refresh_bedrock_cache_task
+            refresh_bedrock_cache_task.delay(prompt, model_type, max_tokens)
+        except Exception as e:
+            logger.warning(f"Failed to queue Bedrock cache refresh: {e}")
+            cache.delete(lock_key)
+            return False
+        return True
     
     def generate_content(self, 
                         prompt: str, 
@@ -119,7 +279,8 @@ class BedrockClient:
                         max_tokens: int = 1000,
                         use_cache: bool = True,
                         max_retries: int = 3,
-                        user=None) -> Dict[str, Any]:
+                        user=None,
+                        refresh: bool = False) -> Dict[str, Any]:
         """
         Generate content using AWS Bedrock with error handling and caching
         
@@ -130,6 +291,7 @@ class BedrockClient:
             use_cache: Whether to use caching
             max_retries: Maximum retry attempts
             user: User making the request (for tracking)
+            refresh: Skip the cache lookup and overwrite the cached entry
             
         Returns:
             Dict containing generated text and metadata
@@ -140,13 +302,16 @@ class BedrockClient:
         # Check cache first
         if use_cache:
             cache_key = self._generate_cache_key(prompt, model_id, max_tokens)
-            cached_result = cache.get(cache_key)
-            if cached_result:
-                logger.info(f"Cache hit for model {model_id}")
-                return cached_result
+            if not refresh:
+                cached_result = self._get_cached(cache_key, prompt, model_type, max_tokens)
+                if cached_result:
+                    logger.info(f"Cache hit for model {model_id}")
+                    return cached_result
         
         # Prepare request body
         body = self._get_model_body(prompt, model_id, max_tokens)
+        # Serialized once and reused by every attempt
+        body_json = orjson.dumps(body)
         
         last_error = None
         for attempt in range(max_retries):
@@ -155,13 +320,13 @@ class BedrockClient:
                 
                 response = self.client.invoke_model(
                     modelId=model_id,
-                    body=json.dumps(body),
+                    body=body_json,
                     contentType='application/json'
                 )
                 
                 response_time = time.time() - start_time
                 response_time_ms = int(response_time * 1000)
-                response_body = json.loads(response['body'].read())
+                response_body = orjson.loads(response['body'].read())
                 
                 # Parse the response
                 generated_text = self._parse_response(response_body, model_id)
@@ -170,8 +335,8 @@ class BedrockClient:
                     raise BedrockClientError("Empty response from model")
                 
                 # Calculate tokens (approximate)
-                prompt_tokens = len(prompt.split())
-                generated_tokens = len(generated_text.split())
+                prompt_tokens = _approx_token_count(prompt)
+                generated_tokens = _approx_token_count(generated_text)
                 total_tokens = prompt_tokens + generated_tokens
                 
                 # Track successful usage
@@ -203,7 +368,7 @@ class BedrockClient:
                 
                 # Cache successful result
                 if use_cache:
-                    cache.set(cache_key, result, timeout=3600)  # Cache for 1 hour
+                    self._set_cached(cache_key, result)
                 
                 logger.info(f"Successfully generated content with {model_id} in {response_time:.2f}s")
                 return result
@@ -213,8 +378,10 @@ class BedrockClient:
                 last_error = f"AWS Error {error_code}: {e}"
                 
                 if error_code in ['ThrottlingException', 'ServiceUnavailableException']:
-                    # Exponential backoff for retryable errors
-                    wait_time = (2 ** attempt) + (time.time() % 1)
+                    if attempt == max_retries - 1:
+                        # Out of attempts; don't sleep before giving up
+                        break
+                    wait_time = _retry_wait(e, attempt)
                     logger.warning(f"Retryable error on attempt {attempt + 1}, waiting {wait_time:.2f}s: {last_error}")
                     time.sleep(wait_time)
                     continue
@@ -223,7 +390,7 @@ class BedrockClient:
                     logger.error(f"Non-retryable AWS error: {last_error}")
                     break
                     
-            except (BotoCoreError, json.JSONDecodeError, Exception) as e:
+            except (BotoCoreError, orjson.JSONDecodeError, Exception) as e:
                 last_error = f"Client error: {e}"
                 logger.warning(f"Error on attempt {attempt + 1}: {last_error}")
                 
@@ -251,25 +418,61 @@ class BedrockClient:
     def generate_multiple_variations(self, 
                                    prompt: str, 
                                    variations: int = 3,
-                                   model_type: str = "fast") -> List[Dict[str, Any]]:
+                                   model_type: str = "fast",
+                                   use_cache: bool = False,
+                                   user=None) -> List[Dict[str, Any]]:
         """Generate multiple variations of content"""
-        results = []
-        for i in range(variations):
-            try:
-                # Add variation instruction to prompt
-                variation_prompt = f"{prompt}\n\nVariasi ke-{i+1}: Berikan pendekatan yang sedikit berbeda."
-                result = self.generate_content(
-                    prompt=variation_prompt,
-                    model_type=model_type,
-                    use_cache=False  # Don't cache variations
-                )
-                result['variation_number'] = i + 1
-                results.append(result)
-            except BedrockClientError as e:
-                logger.error(f"Failed to generate variation {i+1}: {e}")
-                continue
+        results = self.iter_variations(
+            prompt=prompt,
+            variations=variations,
+            model_type=model_type,
+            use_cache=use_cache,
+            user=user
+        )
+        return sorted(results, key=lambda result: result['variation_number'])
+    
+    def iter_variations(self, 
+                        prompt: str, 
+                        variations: int = 3,
+                        model_type: str = "fast",
+                        use_cache: bool = False,
+                        user=None) -> Iterator[Dict[str, Any]]:
+        """
+        Generate variations concurrently, yielding each one as soon as it completes
+        (in completion order; check 'variation_number' for the original order)
+        """
+        if variations <= 0:
+            return
         
-        return results
+        with ThreadPoolExecutor(max_workers=min(variations, MAX_CONCURRENT_VARIATIONS)) as executor:
+            futures = {
+                executor.submit(self._generate_variation, prompt, i + 1, model_type, use_cache, user): i + 1
+                for i in range(variations)
+            }
+            for future in as_completed(futures):
+                try:
+                    yield future.result()
+                except BedrockClientError as e:
+                    logger.error(f"Failed to generate variation {futures[future]}: {e}")
+    
+    def _generate_variation(self, prompt: str, number: int, model_type: str,
+                            use_cache: bool, user=None) -> Dict[str, Any]:
+        """Generate one numbered variation; runs on a worker thread"""
+        try:
+            # Add variation instruction to prompt; the base prompt stays an
+            # identical prefix so each variation keys its own cache entry
+            variation_prompt = f"{prompt}\n\nVariasi ke-{number}: Berikan pendekatan yang sedikit berbeda."
+            result = self.generate_content(
+                prompt=variation_prompt,
+                model_type=model_type,
+                use_cache=use_cache,
+                user=user
+            )
+            result['variation_number'] = number
+            return result
+        finally:
+            # Usage tracking may have opened a DB connection on this thread
+            connection.close()
     
     def test_connection(self) -> Dict[str, Any]:
         """Test connection to Bedrock service"""